@@ -1,13 +1,27 @@
+from collections import namedtuple
+
 import streamlit as st
 import pandas as pd
 
 from package import Package
-from user import User
 from billing import BillingSystem
 from vehicle import Vehicle
 from warehouse import Warehouse
-from service import STANDARD_SERVICE, EXPRESS_OVERNIGHT
 from tracking import TrackingEvent
+from bootstrap import get_db, SERVICE_MAP, SPECIAL_MAP, STATUS_MAP_ZH, MILESTONE_SET
+
+
+# 計費用的簡易客戶物件（只需要 customer_id）
+_MockCustomer = namedtuple("MockCustomer", ["customer_id"])
+
+# Customer 頁面：里程碑進度
+_PROGRESS_MAP = {
+    "Shipment Created": 0.1,
+    "In Transit - Sorting": 0.3,
+    "Picked Up": 0.5,          # 可能在後端存在，但 Customer 里程碑顯示時未必出現
+    "Out for Delivery": 0.8,
+    "Delivered": 1.0,
+}
 
 
 # ============================================================
@@ -18,31 +32,9 @@ st.title("📦 智慧物流管理系統 Demo（完整展示版｜最新）")
 
 
 # ============================================================
-# 初始化（只跑一次）
+# 初始化（bootstrap.get_db：整個 process 只建立一次，各 session 共用）
 # ============================================================
-if "db" not in st.session_state:
-    admin = User("Admin", "123", "admin")
-    cs = User("Customer_Service", "123", "customer_service")
-    wh_user = User("Warehouse_Staff", "123", "warehouse")
-    driver = User("Driver_Jack", "123", "driver")
-
-    warehouse = Warehouse("WH-001", "台北總倉", capacity=10)
-    vehicle = Vehicle("TRUCK-01", "物流卡車", capacity_kg=200)
-    vehicle.assign_driver(driver)
-
-    st.session_state.db = {
-        "users": {
-            "admin": admin,
-            "customer_service": cs,
-            "warehouse": wh_user,
-            "driver": driver
-        },
-        "packages": [],
-        "warehouse": warehouse,
-        "vehicle": vehicle
-    }
-
-db = st.session_state.db
+db = get_db()
 
 
 # ============================================================
@@ -63,45 +55,254 @@ with st.sidebar:
         st.info("Customer（公開查詢，不建立 User）")
 
 
+# ============================================================
+# 狀態更新包裝：同步司機待配送索引
+# ============================================================
+_ACTIVE_STATUSES = frozenset({
+    "In Transit - Sorting",
+    "Picked Up",
+    "Out for Delivery"
+})
+
+
+def update_pkg_status(pkg, new_status, location, user, **kwargs):
+    """
+    呼叫 Package.update_status()，並依包裹狀態維護 db["active_tns"]，
+    讓 Driver 頁面不必每次重掃全部包裹。
+    """
+    pkg.update_status(new_status, location, user, **kwargs)
+    _sync_active_index(pkg)
+
+
+def bulk_update_pkg_status(pkg, transitions):
+    """Package.bulk_update_status() 版本；中途失敗也依實際狀態同步索引"""
+    try:
+        pkg.bulk_update_status(transitions)
+    finally:
+        _sync_active_index(pkg)
+
+
+def _sync_active_index(pkg):
+    """依包裹目前狀態加入 / 移出待配送索引，並遞增 status_version（db 各 session 共用，需持鎖）"""
+    with db["lock"]:
+        if pkg.current_status in _ACTIVE_STATUSES:
+            db["active_tns"][pkg.tracking_number] = None
+        else:
+            db["active_tns"].pop(pkg.tracking_number, None)
+        db["status_version"] += 1
+
+
+# ============================================================
+# Warehouse / Driver 單筆任務：用 fragment 包起來，按鈕只重跑該列
+# ============================================================
+@st.fragment
+def _render_handoff_task(t, wh, user):
+    """在倉包裹單筆列（交付司機）"""
+    colA, colC = st.columns([4, 1])
+    in_wh = t in wh.stored_packages
+
+    if colC.button("🚚 交付司機", key=f"handoff_{t}", disabled=not in_wh) and in_wh:
+        try:
+            pkg = db["packages_by_tn"].get(t)
+            if not pkg:
+                st.error("找不到對應 Package 物件（可能未加入 db['packages']）")
+            else:
+                # 對 Customer 可理解的唯一里程碑
+                update_pkg_status(
+                    pkg,
+                    "In Transit - Sorting",
+                    "Warehouse Dispatch Area",
+                    user
+                )
+                wh.remove_package(t)  # 離開倉庫
+                st.success(f"{t} 已交付司機（離開倉庫）")
+        except Exception as e:
+            st.error(f"交付失敗：{e}")
+
+    # 按鈕處理完才寫標題，fragment 重跑時即顯示最新狀態
+    if t in wh.stored_packages:
+        colA.write(f"**{t}**")
+    else:
+        colA.write(f"~~{t}~~ 已交付司機")
+
+
+@st.fragment
+def _render_driver_task(pkg, v, user):
+    """單筆配送任務（成功配送 / 配送失敗）"""
+    info = st.empty()
+    c_ok, c_fail = st.columns(2)
+    done = pkg.current_status == "Delivered"
+
+    # ✅ 成功配送（完整流程：Picked Up -> Out -> Delivered）
+    if c_ok.button(f"✅ 成功配送 {pkg.tracking_number}", key=f"ok_{pkg.tracking_number}",
+                   disabled=done) and not done:
+        try:
+            bulk_update_pkg_status(pkg, [
+                ("Picked Up", "Warehouse Dock", user, v),
+                ("Out for Delivery", "On the Road", user, v),
+                ("Delivered", "Customer Address", user, v)
+            ])
+            st.success("配送完成")
+        except Exception as e:
+            st.error(f"配送失敗：{e}")
+
+    # ❌ 配送失敗（不 Delivered，只記錄異常，允許之後再成功）
+    if c_fail.button(f"❌ 配送失敗 {pkg.tracking_number}", key=f"fail_{pkg.tracking_number}",
+                     disabled=done) and not done:
+        try:
+            update_pkg_status(
+                pkg,
+                new_status="Out for Delivery",
+                location="Customer Address",
+                user=user,
+                exception_type="Customer Not Available"
+            )
+            st.warning("已回報配送失敗（可稍後重新配送）")
+        except Exception as e:
+            st.error(f"回報失敗：{e}")
+
+    info.write(f"**{pkg.tracking_number}** ｜ 狀態：{pkg.current_status} ｜ 在倉：{pkg.warehouse_id or '—'}")
+
+
 # ============================================================
 # Customer 顯示：合併里程碑事件（避免訊息洗版）
 # ============================================================
-def merge_customer_events(events):
+
+def merge_and_summarize(events):
     """
     Customer 只看「業務里程碑」：
     Shipment Created / In Transit - Sorting / Out for Delivery / Delivered
     且連續相同狀態只顯示一次，避免 Driver 技術事件洗版。
+    同一趟迴圈順便找出最後一筆異常事件，回傳 (merged, last_exc)。
     """
-    visible = {
-        "Shipment Created",
-        "In Transit - Sorting",
-        "Out for Delivery",
-        "Delivered"
-    }
     merged = []
     last_status = None
+    last_exc = None
 
     for e in events:
-        if e.status_description not in visible:
-            continue
-        if e.status_description != last_status:
+        if e.exception_type:
+            last_exc = e
+        status = e.status_description
+        if status != last_status and status in MILESTONE_SET:
             merged.append(e)
-            last_status = e.status_description
+            last_status = status
 
     # 若完全沒有里程碑（理論上不該），回傳原始 events 的最後一筆保底
-    if not merged and events:
-        return [events[-1]]
-    return merged
+    return merged or events[-1:], last_exc
+
+
+# ============================================================
+# 表格快取：事件數（或紀錄數）作為版本鍵，資料沒變就直接沿用
+# ============================================================
+CACHE_TTL = 600
+TS_FMT = "%Y-%m-%d %H:%M:%S"
+
+
+def _fmt_times(values, fmt=TS_FMT):
+    """一整欄時間一次格式化（DatetimeIndex.strftime，不逐筆呼叫 datetime.strftime）"""
+    return pd.DatetimeIndex(values).strftime(fmt)
+
+
+def _events_frame(events) -> pd.DataFrame:
+    """倉庫 / 車輛事件表：逐欄建立，時間整欄一次格式化"""
+    return pd.DataFrame({
+        "時間": _fmt_times([e.timestamp for e in events]),
+        "Tracking": [e.tracking_number for e in events],
+        "狀態": [e.status_description for e in events],
+        "地點": [e.location for e in events],
+        "操作者": [e.user.username if e.user else "System" for e in events],
+        "異常": [e.exception_type or "" for e in events]
+    })
+
+
+@st.cache_data(ttl=CACHE_TTL)
+def _history_df(tracking_number: str, n_events: int) -> pd.DataFrame:
+    """客服視角的完整事件表（n_events 僅作為快取鍵）"""
+    events = TrackingEvent.get_history(tracking_number)
+    return pd.DataFrame({
+        "時間": _fmt_times([e.timestamp for e in events]),
+        "狀態": [e.status_description for e in events],
+        "地點": [e.location for e in events],
+        "操作者": [e.user.username if e.user else "System" for e in events],
+        "車輛": [e.vehicle_id or "" for e in events],
+        "倉庫": [e.warehouse_id or "" for e in events],
+        "異常": [e.exception_type or "" for e in events]
+    })
+
+
+@st.cache_data(ttl=CACHE_TTL)
+def _warehouse_events_df(warehouse_id: str, n_events: int) -> pd.DataFrame:
+    """倉庫相關事件表"""
+    return _events_frame(Warehouse.get(warehouse_id).list_warehouse_events())
+
+
+@st.cache_data(ttl=CACHE_TTL)
+def _vehicle_events_df(_vehicle: Vehicle, vehicle_id: str, n_events: int) -> pd.DataFrame:
+    """車輛相關事件表（_vehicle 不參與雜湊，以 vehicle_id 區分）"""
+    return _events_frame(_vehicle.vehicle_activity())
+
+
+@st.cache_data(ttl=CACHE_TTL)
+def _pkgs_summary_df(_packages, n_pkgs: int, status_version: int) -> pd.DataFrame:
+    """已建立包裹清單（只在包裹數或狀態版本變動時重建）"""
+    return pd.DataFrame({
+        "Tracking": [p.tracking_number for p in _packages],
+        "Customer": [p.customer_id for p in _packages],
+        "狀態": [p.current_status for p in _packages],
+        "在倉": [p.warehouse_id if p.warehouse_id else "—" for p in _packages],
+        "ETA": _fmt_times([p.eta for p in _packages], "%Y-%m-%d"),
+        "運費": [p.billing_cost for p in _packages]
+    })
+
+
+@st.cache_data(ttl=CACHE_TTL)
+def _status_counts_df(_packages, n_pkgs: int, status_version: int) -> pd.DataFrame:
+    """包裹狀態統計（n_pkgs / status_version 僅作為快取鍵）"""
+    return (
+        pd.Series([p.current_status for p in _packages])
+        .value_counts()
+        .sort_index()
+        .rename_axis("狀態")
+        .reset_index(name="數量")
+        .astype({"狀態": "category", "數量": "int32"})
+    )
+
+
+@st.cache_data(ttl=CACHE_TTL)
+def _billing_df(n_records: int) -> pd.DataFrame:
+    """財務收支明細表"""
+    records = BillingSystem.list_all_records()
+    return pd.DataFrame({
+        "時間": pd.DatetimeIndex([r.timestamp for r in records]),
+        "單號": [r.tracking_number for r in records],
+        "金額": [r.amount for r in records],
+        "方式": [r.method for r in records],
+        "退款": ["是" if getattr(r, "is_refund", False) else "否" for r in records]
+    }).astype({"金額": "float32", "方式": "category", "退款": "category"})
+
+
+@st.cache_data(ttl=CACHE_TTL)
+def _error_log_df(n_errors: int) -> pd.DataFrame:
+    """系統錯誤紀錄表"""
+    logs = TrackingEvent.error_logs
+    return pd.DataFrame({
+        "時間": _fmt_times([x["time"] for x in logs]),
+        "Tracking": [x["tracking_number"] for x in logs],
+        "訊息": [x["msg"] for x in logs]
+    })
 
 
 def render_customer_tracking(tracking_number: str):
-    history = TrackingEvent.get_history(tracking_number)
-    if not history:
-        st.error("❌ 查無此包裹")
-        return
+    # 摘要只需要最新里程碑（O(1)），完整歷史等使用者展開時才查
+    latest = TrackingEvent.latest_milestone(tracking_number)
+    if latest is None:
+        history = TrackingEvent.get_history(tracking_number)
+        if not history:
+            st.error("❌ 查無此包裹")
+            return
+        latest = history[-1]
 
-    pkg = next((p for p in db["packages"] if p.tracking_number == tracking_number), None)
-    latest = history[-1]
+    pkg = db["packages_by_tn"].get(tracking_number)
 
     # ===== Summary（像 Customer 頁面）=====
     st.subheader("📦 包裹摘要")
@@ -115,14 +316,7 @@ def render_customer_tracking(tracking_number: str):
         st.info(f"🚚 服務：{pkg.service_type.name} ｜ 📏 距離：{pkg.distance_km} km ｜ ⚖️ 重量：{pkg.weight} kg")
 
     # ===== 進度條（里程碑）=====
-    progress_map = {
-        "Shipment Created": 0.1,
-        "In Transit - Sorting": 0.3,
-        "Picked Up": 0.5,          # 可能在後端存在，但 Customer 里程碑顯示時未必出現
-        "Out for Delivery": 0.8,
-        "Delivered": 1.0,
-    }
-    st.progress(progress_map.get(latest.status_description, 0.0))
+    st.progress(_PROGRESS_MAP.get(latest.status_description, 0.0))
 
     # ===== 狀態提示 =====
     if latest.status_description == "Delivered":
@@ -138,18 +332,13 @@ def render_customer_tracking(tracking_number: str):
 
     # ===== Timeline（合併顯示）=====
     st.subheader("📋 配送進度（Customer 里程碑）")
-    merged = merge_customer_events(history)
-
-    status_map = {
-        "Shipment Created": "包裹已建立",
-        "In Transit - Sorting": "倉庫分揀中",
-        "Out for Delivery": "配送中",
-        "Delivered": "已送達"
-    }
-
-    for e in merged:
-        ts = e.timestamp.strftime("%Y-%m-%d %H:%M")
-        text = status_map.get(e.status_description, e.status_description)
+    if not st.toggle("顯示配送進度明細", key=f"timeline_{tracking_number}"):
+        return
+
+    merged, last_exc = merge_and_summarize(TrackingEvent.get_history(tracking_number))
+
+    for e, ts in zip(merged, _fmt_times([e.timestamp for e in merged], "%Y-%m-%d %H:%M")):
+        text = STATUS_MAP_ZH.get(e.status_description, e.status_description)
         st.markdown(
             f"""
             **{text}**  
@@ -161,11 +350,9 @@ def render_customer_tracking(tracking_number: str):
             st.error(f"⚠️ 配送異常：{e.exception_type}")
 
     # ===== 額外：若有異常，顯示最後一筆異常（更直覺）=====
-    exceptions = [e for e in history if e.exception_type]
-    if exceptions:
+    if last_exc:
         st.divider()
         st.subheader("⚠️ 異常紀錄")
-        last_exc = exceptions[-1]
         st.error(
             f"最後異常：{last_exc.exception_type} ｜ "
             f"{last_exc.timestamp.strftime('%Y-%m-%d %H:%M')} ｜ {last_exc.location}"
@@ -211,22 +398,13 @@ elif role == "customer_service":
             customer_id = st.text_input("客戶 ID", value="CUST-01")
             weight = st.number_input("重量 (kg)", 0.1, 100.0, 5.0)
             distance = st.slider("距離 (km)", 1, 500, 50)
-            svc = st.radio("服務類型", ["標準速遞", "隔夜達", "經濟速遞（展示）"])
-            SERVICE_MAP = {
-                "標準速遞": STANDARD_SERVICE,
-                "隔夜達": EXPRESS_OVERNIGHT,
-                "經濟速遞（展示）": STANDARD_SERVICE  # 展示用，不影響後端
-            }
+            svc = st.radio("服務類型", list(SERVICE_MAP))
             declared_value = st.number_input("申報價值", 0.0, 1000000.0, 1000.0)
             description = st.text_input("描述", value="Demo Package")
             special_ui = st.multiselect(
                 "特殊服務（展示/實際進系統）",
-                ["易碎品", "危險物品"]
+                list(SPECIAL_MAP)
             )
-            SPECIAL_MAP = {
-                "易碎品": "Fragile",
-                "危險物品": "Dangerous"
-            }
             special_services = [SPECIAL_MAP[s] for s in special_ui]
             submit = st.form_submit_button("建立包裹並入庫/計費")
 
@@ -248,11 +426,11 @@ elif role == "customer_service":
                     )
 
                     # 計費：你沒 Customer 類別就用 mock
-                    from collections import namedtuple
-                    MockCustomer = namedtuple("MockCustomer", ["customer_id"])
-                    BillingSystem.record_payment(MockCustomer(customer_id), pkg, "Immediate Payment")
+                    BillingSystem.record_payment(_MockCustomer(customer_id), pkg, "Immediate Payment")
 
-                    db["packages"].append(pkg)
+                    with db["lock"]:
+                        db["packages"].append(pkg)
+                        db["packages_by_tn"][pkg.tracking_number] = pkg
                     st.caption(
                         f"費用說明：基礎費 + 重量({weight}kg) + 距離({distance}km)"
                     )
@@ -265,16 +443,11 @@ elif role == "customer_service":
     with col2:
         st.subheader("📋 已建立包裹清單")
         if db["packages"]:
-            st.dataframe(pd.DataFrame([
-                {
-                    "Tracking": p.tracking_number,
-                    "Customer": p.customer_id,
-                    "狀態": p.current_status,
-                    "在倉": p.warehouse_id if p.warehouse_id else "—",
-                    "ETA": p.eta.strftime("%Y-%m-%d"),
-                    "運費": p.billing_cost
-                } for p in db["packages"]
-            ]), use_container_width=True)
+            st.dataframe(_pkgs_summary_df(
+                db["packages"], len(db["packages"]), db["status_version"]
+            ), use_container_width=True, column_config={
+                "運費": st.column_config.NumberColumn(format="$%.2f")
+            })
         else:
             st.info("尚無包裹")
 
@@ -282,19 +455,11 @@ elif role == "customer_service":
     st.subheader("🔎 快速查詢（客服視角：看完整事件）")
     q = st.text_input("輸入 tracking 查詢（客服可看完整事件）", key="cs_query")
     if q:
-        events = TrackingEvent.get_history(q)
-        if not events:
+        events_df = _history_df(q, len(TrackingEvent.all_events))
+        if events_df.empty:
             st.error("查無此包裹")
         else:
-            st.dataframe(pd.DataFrame([{
-                "時間": e.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-                "狀態": e.status_description,
-                "地點": e.location,
-                "操作者": e.user.username if e.user else "System",
-                "車輛": e.vehicle_id or "",
-                "倉庫": e.warehouse_id or "",
-                "異常": e.exception_type or ""
-            } for e in events]), use_container_width=True)
+            st.dataframe(events_df, use_container_width=True)
 
 
 # ------------------------------------------------------------
@@ -318,42 +483,16 @@ elif role == "warehouse":
     pkgs_in_wh = wh.list_packages()
     if pkgs_in_wh:
         for t in pkgs_in_wh:
-            colA, colC = st.columns([4, 1])
-            colA.write(f"**{t}**")
-
-            if colC.button("🚚 交付司機", key=f"handoff_{t}"):
-                try:
-                    pkg = next((p for p in db["packages"] if p.tracking_number == t), None)
-                    if not pkg:
-                        st.error("找不到對應 Package 物件（可能未加入 db['packages']）")
-                    else:
-                        # 對 Customer 可理解的唯一里程碑
-                        pkg.update_status(
-                            "In Transit - Sorting",
-                            "Warehouse Dispatch Area",
-                            current_user
-                        )
-                        wh.remove_package(t)  # 離開倉庫
-                        st.success(f"{t} 已交付司機（離開倉庫）")
-                        st.rerun()
-                except Exception as e:
-                    st.error(f"交付失敗：{e}")
+            _render_handoff_task(t, wh, current_user)
 
     else:
         st.info("倉庫目前無包裹")
 
     st.divider()
     st.subheader("📑 倉庫事件（Warehouse 可看完整事件）")
-    wh_events = wh.list_warehouse_events()
-    if wh_events:
-        st.dataframe(pd.DataFrame([{
-            "時間": e.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-            "Tracking": e.tracking_number,
-            "狀態": e.status_description,
-            "地點": e.location,
-            "操作者": e.user.username if e.user else "System",
-            "異常": e.exception_type or ""
-        } for e in wh_events]), use_container_width=True)
+    wh_events_df = _warehouse_events_df(wh.warehouse_id, len(TrackingEvent.all_events))
+    if not wh_events_df.empty:
+        st.dataframe(wh_events_df, use_container_width=True)
     else:
         st.info("目前沒有倉庫相關事件")
 
@@ -373,59 +512,21 @@ elif role == "driver":
     st.divider()
     st.subheader("📦 可處理包裹（未 Delivered）")
 
-    active_pkgs = [
-        p for p in db["packages"]
-        if p.current_status in {
-            "In Transit - Sorting",
-            "Picked Up",
-            "Out for Delivery"
-        }
-    ]
+    # 先在鎖內取快照：其他 session 可能同時增刪 active_tns
+    with db["lock"]:
+        active_tns = list(db["active_tns"])
+    active_pkgs = [db["packages_by_tn"][t] for t in active_tns]
     if not active_pkgs:
         st.info("目前沒有待配送包裹")
     else:
         for pkg in active_pkgs:
-            st.write(f"**{pkg.tracking_number}** ｜ 狀態：{pkg.current_status} ｜ 在倉：{pkg.warehouse_id or '—'}")
-
-            c_ok, c_fail = st.columns(2)
-
-            # ✅ 成功配送（完整流程：Picked Up -> Out -> Delivered）
-            if c_ok.button(f"✅ 成功配送 {pkg.tracking_number}", key=f"ok_{pkg.tracking_number}"):
-                try:
-                    pkg.update_status("Picked Up", "Warehouse Dock", current_user, vehicle=v)
-                    pkg.update_status("Out for Delivery", "On the Road", current_user, vehicle=v)
-                    pkg.update_status("Delivered", "Customer Address", current_user, vehicle=v)
-                    st.success("配送完成")
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"配送失敗：{e}")
-
-            # ❌ 配送失敗（不 Delivered，只記錄異常，允許之後再成功）
-            if c_fail.button(f"❌ 配送失敗 {pkg.tracking_number}", key=f"fail_{pkg.tracking_number}"):
-                try:
-                    pkg.update_status(
-                        new_status="Out for Delivery",
-                        location="Customer Address",
-                        user=current_user,
-                        exception_type="Customer Not Available"
-                    )
-                    st.warning("已回報配送失敗（可稍後重新配送）")
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"回報失敗：{e}")
+            _render_driver_task(pkg, v, current_user)
 
     st.divider()
     st.subheader("🧾 車輛事件（Driver 可看完整事件）")
-    veh_events = v.vehicle_activity()
-    if veh_events:
-        st.dataframe(pd.DataFrame([{
-            "時間": e.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-            "Tracking": e.tracking_number,
-            "狀態": e.status_description,
-            "地點": e.location,
-            "操作者": e.user.username if e.user else "System",
-            "異常": e.exception_type or ""
-        } for e in veh_events]), use_container_width=True)
+    veh_events_df = _vehicle_events_df(v, v.vehicle_id, len(TrackingEvent.all_events))
+    if not veh_events_df.empty:
+        st.dataframe(veh_events_df, use_container_width=True)
     else:
         st.info("目前沒有車輛相關事件")
 
@@ -451,12 +552,9 @@ elif role == "admin":
     # ===== 包裹狀態統計（像 admin.html 那種表格）=====
     st.subheader("📦 包裹狀態總覽")
     if db["packages"]:
-        status_counts = {}
-        for p in db["packages"]:
-            status_counts[p.current_status] = status_counts.get(p.current_status, 0) + 1
-        st.dataframe(pd.DataFrame([
-            {"狀態": k, "數量": v} for k, v in sorted(status_counts.items(), key=lambda x: x[0])
-        ]), use_container_width=True)
+        st.dataframe(_status_counts_df(
+            db["packages"], len(db["packages"]), db["status_version"]
+        ), use_container_width=True)
     else:
         st.info("尚無包裹資料")
 
@@ -464,15 +562,16 @@ elif role == "admin":
 
     # ===== 財務紀錄（完整）=====
     st.subheader("💰 財務收支明細（BillingSystem.all_records）")
-    records = BillingSystem.list_all_records()
-    if records:
-        st.dataframe(pd.DataFrame([{
-            "時間": r.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-            "單號": r.tracking_number,
-            "金額": r.amount,
-            "方式": r.method,
-            "退款": "是" if getattr(r, "is_refund", False) else "否"
-        } for r in records]), use_container_width=True)
+    if BillingSystem.all_records:
+        st.dataframe(
+            _billing_df(len(BillingSystem.all_records)),
+            column_config={
+                "金額": st.column_config.NumberColumn(format="$%.2f"),
+                "時間": st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm:ss")
+            },
+            use_container_width=True,
+            hide_index=True
+        )
     else:
         st.info("目前尚無計費紀錄。")
 
@@ -503,10 +602,6 @@ elif role == "admin":
     # （可選）顯示錯誤 log（你 tracking.py 有 error_logs）
     with st.expander("查看系統錯誤紀錄（error_logs）"):
         if TrackingEvent.error_logs:
-            st.dataframe(pd.DataFrame([{
-                "時間": x["time"].strftime("%Y-%m-%d %H:%M:%S"),
-                "Tracking": x["tracking_number"],
-                "訊息": x["msg"]
-            } for x in TrackingEvent.error_logs]), use_container_width=True)
+            st.dataframe(_error_log_df(len(TrackingEvent.error_logs)), use_container_width=True)
         else:
             st.info("目前沒有錯誤紀錄")
@@ -1,34 +1,36 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
+from collections import namedtuple
 import time
 
 # --- 核心模組匯入 ---
 from package import Package
-from user import User
 from billing import BillingSystem
-from vehicle import Vehicle
-from warehouse import Warehouse
 from service import STANDARD_SERVICE, EXPRESS_OVERNIGHT
 from tracking import TrackingEvent
+from bootstrap import get_db
+
+# 計費用的簡易客戶物件（只需要 customer_id）
+_MockCustomer = namedtuple("M_Cust", ["customer_id"])
 
 # ============================================================
-# 初始化系統資料
+# 初始化系統資料（bootstrap.get_db：只建立一次，各 session 共用）
 # ============================================================
-if "db" not in st.session_state:
-    st.session_state.db = {
-        "users": {
-            "admin": User("管理經理", "123", "admin"),
-            "cs": User("受理人員", "123", "customer_service"),
-            "warehouse": User("倉庫專員", "123", "warehouse"),
-            "driver": User("配送司機", "123", "driver")
-        },
-        "packages": [],
-        "warehouse": Warehouse("WH-001", "台北轉運中心", capacity=50),
-        "vehicle": Vehicle("TRUCK-A1", "物流貨車", capacity_kg=1000)
-    }
-
-db = st.session_state.db
+db = get_db(warehouse_capacity=50, vehicle_capacity_kg=1000)
+
+# 司機端需要處理的狀態
+_ACTIVE_STATUSES = frozenset({"In Transit", "Out for Delivery"})
+
+
+def update_pkg_status(p, new_status, location, user, **kwargs):
+    """更新包裹狀態，並同步 db["active_tns"]（司機待配送清單）"""
+    p.update_status(new_status, location, user, **kwargs)
+    with db["lock"]:
+        if new_status in _ACTIVE_STATUSES:
+            db["active_tns"][p.tracking_number] = None
+        else:
+            db["active_tns"].pop(p.tracking_number, None)
 
 # ============================================================
 # 側邊欄權限切換
@@ -79,21 +81,20 @@ if role_view == "寄件與服務受理":
             # 2. 建立包裹實例
             svc = STANDARD_SERVICE if "標準" in svc_level else EXPRESS_OVERNIGHT
             new_p = Package(cust_name, float(weight), "標準箱", float(val), desc, svc, specials, float(dist),
-                            db['users']['cs'])
+                            db['users']['customer_service'])
 
             # 強制更新費用（對齊計算結果）
             new_p.billing_cost = total_amount
 
             # 3. 系統存檔與連動
-            db["packages"].append(new_p)
+            with db["lock"]:
+                db["packages"].append(new_p)
+                db["packages_by_tn"][new_p.tracking_number] = new_p
             db["warehouse"].add_package(new_p.tracking_number)
 
             # 4. 記錄收款明細 (金錢是如何收到的)
             payment_detail = f"基礎:{base_fee} + 重量:{weight_fee} + 距離:{dist_fee} + 特殊服務:{special_fee}"
-            from collections import namedtuple
-
-            M_Cust = namedtuple("M_Cust", ["customer_id"])
-            BillingSystem.record_payment(M_Cust(cust_name), new_p, f"結算方式: {cust_type} ({payment_detail})")
+            BillingSystem.record_payment(_MockCustomer(cust_name), new_p, f"結算方式: {cust_type} ({payment_detail})")
 
             st.success(f"運單建立成功！唯一追蹤編號：{new_p.tracking_number}")
             st.write(f"**總計費用：${total_amount:.2f}**")
@@ -113,8 +114,10 @@ elif role_view == "客戶查詢端":
 
             st.divider()
             st.write("#### 歷史追蹤詳情")
-            for e in reversed(history):
-                st.write(f"🕒 {e.timestamp.strftime('%Y-%m-%d %H:%M')} | {e.location} | **{e.status_description}**")
+            timeline = history[::-1]
+            stamps = pd.to_datetime([e.timestamp for e in timeline]).strftime('%Y-%m-%d %H:%M')
+            for e, ts in zip(timeline, stamps):
+                st.write(f"🕒 {ts} | {e.location} | **{e.status_description}**")
         else:
             st.error("查無紀錄，請檢查單號是否輸入正確。")
 
@@ -129,9 +132,9 @@ elif role_view == "倉儲管理":
         c1, c2 = st.columns([3, 1])
         c1.write(f"包裹編號：`{tid}`")
         if c2.button("執行分揀出庫", key=tid):
-            p = next(x for x in db["packages"] if x.tracking_number == tid)
+            p = db["packages_by_tn"][tid]
             # 這裡必須更新為 "In Transit"，以便司機能抓到這筆資料
-            p.update_status("In Transit", "物流分揀中心", db['users']['warehouse'])
+            update_pkg_status(p, "In Transit", "物流分揀中心", db['users']['warehouse'])
             wh.remove_package(tid)
             st.success(f"包裹 {tid} 已轉交物流部")
             time.sleep(0.5)
@@ -145,7 +148,9 @@ elif role_view == "配送任務":
 
     # 【關鍵修正】：確保這裡過濾的狀態包含 "In Transit"
     # 這樣倉庫一出庫，司機這邊就會立刻跳出該包裹
-    tasks = [p for p in db["packages"] if p.current_status in ["In Transit", "Out for Delivery"]]
+    with db["lock"]:
+        active_tns = list(db["active_tns"])
+    tasks = [db["packages_by_tn"][t] for t in active_tns]
 
     if not tasks:
         st.info("目前無待處理的配送任務。")
@@ -155,11 +160,11 @@ elif role_view == "配送任務":
                 c1, c2 = st.columns(2)
                 # 司機點擊「開始配送」後，狀態變為 "Out for Delivery"
                 if c1.button("🚚 開始配送", key=f"drive_{p.tracking_number}"):
-                    p.update_status("Out for Delivery", "配送卡車中", db['users']['driver'], vehicle=v)
+                    update_pkg_status(p, "Out for Delivery", "配送卡車中", db['users']['driver'], vehicle=v)
                     st.rerun()
                 # 司機點擊「確認簽收」後，狀態變為 "Delivered"
                 if c2.button("🏁 確認投遞簽收", key=f"finish_{p.tracking_number}"):
-                    p.update_status("Delivered", "客戶目的地", db['users']['driver'], vehicle=v)
+                    update_pkg_status(p, "Delivered", "客戶目的地", db['users']['driver'], vehicle=v)
                     st.success("簽收完成！")
                     time.sleep(0.5)
                     st.rerun()
@@ -174,15 +179,21 @@ elif role_view == "系統管理總覽":
         st.subheader("歷史計費數據清單")
         all_recs = BillingSystem.list_all_records()
         if all_recs:
-            recs_data = []
-            for r in all_recs:
-                recs_data.append({
-                    "單號": r.tracking_number,
-                    "總金額": f"${r.amount:.2f}",
-                    "付款細節與計算來源": r.method,
-                    "時間戳記": r.timestamp.strftime('%Y-%m-%d %H:%M')
-                })
-            st.table(recs_data)
+            recs_df = pd.DataFrame({
+                "單號": [r.tracking_number for r in all_recs],
+                "總金額": [r.amount for r in all_recs],
+                "付款細節與計算來源": [r.method for r in all_recs],
+                "時間戳記": pd.DatetimeIndex([r.timestamp for r in all_recs])
+            }).astype({"總金額": "float32"})
+            st.dataframe(
+                recs_df,
+                column_config={
+                    "總金額": st.column_config.NumberColumn(format="$%.2f"),
+                    "時間戳記": st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm")
+                },
+                use_container_width=True,
+                hide_index=True
+            )
         else:
             st.write("目前尚無計費紀錄。")
 
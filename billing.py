@@ -1,6 +1,40 @@
 # billing.py
+import io
+import logging
+import sys
+import threading
+from array import array
+from collections import defaultdict
 from datetime import datetime
 
+from clock import now_ns, ns_to_datetime, month_key
+
+log = logging.getLogger(__name__)
+
+
+def _bincount_totals(codes, amounts, refund, n_codes, months=None, key=None):
+    """
+    非退款列依客戶代碼分組加總
+    ------------------------------------------------------------
+    - np.frombuffer 直接讀 array 的 buffer（不複製），np.bincount 一次分組加總
+    - months / key：只算 months[i] == key 的列（月結統計）
+    - 回傳 (各代碼總額, 各代碼筆數) 兩個 list
+    - 呼叫端持有 BillingSystem._lock；buffer 的 view 在函式結束時釋放，
+      之後 array 才能繼續 append
+    ------------------------------------------------------------
+    """
+    import numpy as np   # 只有統計報表用到，核心模組載入時不需要 NumPy
+
+    keep = np.frombuffer(refund, dtype=refund.typecode) == 0
+    if months is not None:
+        keep &= np.frombuffer(months, dtype=months.typecode) == key
+    c = np.frombuffer(codes, dtype=codes.typecode)[keep]
+    a = np.frombuffer(amounts, dtype=amounts.typecode)[keep]
+    return (
+        np.bincount(c, weights=a, minlength=n_codes).tolist(),
+        np.bincount(c, minlength=n_codes).tolist()
+    )
+
 
 class BillingRecord:
     """
@@ -19,20 +53,32 @@ class BillingRecord:
     - 放進 MonthlyStatement 的明細
     """
 
+    __slots__ = (
+        "customer_id", "tracking_number", "amount", "method", "is_refund",
+        "_ts_ns", "_line"
+    )
+
     def __init__(self, customer_id, tracking_number, amount, method, is_refund=False):
-        self.customer_id = customer_id
+        self.customer_id = sys.intern(customer_id)  # 同一客戶共用同一字串物件
         self.tracking_number = tracking_number
         self.amount = amount
         self.method = method
         self.is_refund = is_refund
-        self.timestamp = datetime.now()
+        self._ts_ns = now_ns()  # 建立時間（epoch 奈秒，timestamp 需要時才轉 datetime）
+        self._line = None  # 輸出字串快取（第一次輸出時才產生，之後直接重用）
+
+    @property
+    def timestamp(self):
+        return ns_to_datetime(self._ts_ns)
 
     def __str__(self):
-        tag = "（退款）" if self.is_refund else ""
-        return (
-            f"[{self.timestamp.strftime('%Y-%m-%d %H:%M:%S')}] "
-            f"{self.method}{tag} - 客戶 {self.customer_id} - 包裹 {self.tracking_number} - 金額 {self.amount:.2f}"
-        )
+        if self._line is None:
+            tag = "（退款）" if self.is_refund else ""
+            self._line = (
+                f"[{self.timestamp.strftime('%Y-%m-%d %H:%M:%S')}] "
+                f"{self.method}{tag} - 客戶 {self.customer_id} - 包裹 {self.tracking_number} - 金額 {self.amount:.2f}"
+            )
+        return self._line
 
 
 class MonthlyStatement:
@@ -42,6 +88,7 @@ class MonthlyStatement:
     - 一位合約客戶（Contract Customer）一個帳單實例
     - records：BillingRecord 的集合
     - created_date：帳單建立時間
+    - _total：加入紀錄時即時累加的總金額（total_amount 不必重新加總）
 
     用途：
     - BillingSystem.monthly_statements 使用 customer_id → MonthlyStatement 映射
@@ -51,30 +98,46 @@ class MonthlyStatement:
     def __init__(self, customer_id):
         self.customer_id = customer_id
         self.records = []
-        self.created_date = datetime.now()
+        self._created_ns = now_ns()
+        self._created_str = None
+        self._total = 0.0
+
+    @property
+    def created_date(self):
+        return ns_to_datetime(self._created_ns)
 
     @property
     def total_amount(self):
-        """計算所有非退款（is_refund=False）的金額總和"""
-        return sum(r.amount for r in self.records if not r.is_refund)
+        """所有非退款（is_refund=False）的金額總和（O(1)，由 add_record 累加）"""
+        return self._total
 
     def add_record(self, record):
-        """加入一筆 BillingRecord"""
+        """加入一筆 BillingRecord（退款紀錄只列入明細，不計入總額）"""
+        self.records.append(record)
+        if not record.is_refund:
+            self._total += record.amount
+
+    def apply_refund(self, record):
+        """將退款紀錄加入帳單並從總額扣除（record.amount 為負數）"""
         self.records.append(record)
+        self._total += record.amount
 
     def __str__(self):
-        lines = [
-            f"===== 月結帳單：客戶 {self.customer_id} =====",
-            f"建立日期：{self.created_date.strftime('%Y-%m-%d')}",
-            "明細："
-        ]
-        # 印出所有紀錄
-        lines += [f" - {r}" for r in self.records]
+        if self._created_str is None:
+            self._created_str = self.created_date.strftime('%Y-%m-%d')
+        buf = io.StringIO()
+        buf.write(
+            f"===== 月結帳單：客戶 {self.customer_id} =====\n"
+            f"建立日期：{self._created_str}\n"
+            "明細：\n"
+        )
+        # 印出所有紀錄（每筆字串由 BillingRecord 快取）
+        buf.writelines(f" - {r}\n" for r in self.records)
 
-        lines.append(f"\n總金額：{self.total_amount:.2f}")
-        lines.append("===============================\n")
+        buf.write(f"\n總金額：{self.total_amount:.2f}\n")
+        buf.write("===============================\n")
 
-        return "\n".join(lines)
+        return buf.getvalue()
 
 
 class BillingSystem:
@@ -92,10 +155,63 @@ class BillingSystem:
     全域資料：
     - all_records：所有 BillingRecord，包含三類付款 + 退款
     - monthly_statements：customer_id → MonthlyStatement
+    - _records_by_customer：customer_id → 該客戶的 BillingRecord（查詢索引）
+    - 欄位式儲存（統計報表用，與 all_records 逐筆對齊）：
+        _cust_codes：customer_id → 整數代碼（第一次出現時配發）
+        _cust_ids：代碼 → customer_id
+        _col_codes / _col_amounts / _col_refund：客戶代碼 / 金額 / 是否退款
+        _col_month：年 * 12 + (月 - 1)，月結統計的分組鍵
+    - _lock：Streamlit 各 session 在不同執行緒呼叫，
+      複合寫入（紀錄 + 索引 + 欄位、月結帳單建立）與統計掃描需持鎖
     """
 
     all_records = []  # 保存所有付款紀錄
     monthly_statements = {}  # customer_id → MonthlyStatement
+    _records_by_customer = defaultdict(list)  # customer_id → [BillingRecord]
+
+    _cust_codes = {}
+    _cust_ids = []
+    _col_codes = array("l")
+    _col_amounts = array("d")
+    _col_refund = array("b")
+    _col_month = array("l")
+
+    _lock = threading.Lock()
+
+    # ------------------------------------------------------------
+    # 紀錄寫入（所有付款 / 退款都經過這裡，同步維護索引）
+    # ------------------------------------------------------------
+    @classmethod
+    def _add_record(cls, record):
+        # 先算好所有欄位值（轉型失敗在這裡就拋出），之後的 append 不會寫到一半出錯，
+        # all_records / 索引 / 欄位永遠逐筆對齊
+        month = month_key(record._ts_ns)
+        amount = float(record.amount)
+        refund = 1 if record.is_refund else 0
+        cid = record.customer_id
+        with cls._lock:
+            code = cls._cust_codes.get(cid)
+            if code is None:
+                code = cls._cust_codes[cid] = len(cls._cust_ids)
+                cls._cust_ids.append(cid)
+
+            cls.all_records.append(record)
+            cls._records_by_customer[cid].append(record)
+            cls._col_codes.append(code)
+            cls._col_amounts.append(amount)
+            cls._col_refund.append(refund)
+            cls._col_month.append(month)
+
+    @classmethod
+    def reset(cls):
+        """清空所有付款紀錄、月結帳單與索引（測試用）"""
+        with cls._lock:
+            cls.all_records.clear()
+            cls.monthly_statements.clear()
+            cls._records_by_customer.clear()
+            cls._cust_codes.clear()
+            cls._cust_ids.clear()
+            del cls._col_codes[:], cls._col_amounts[:], cls._col_refund[:], cls._col_month[:]
 
     # ------------------------------------------------------------
     # (A) 通用付款 API（由 Customer 呼叫）
@@ -112,7 +228,7 @@ class BillingSystem:
             amount=package.billing_cost,
             method=method
         )
-        cls.all_records.append(record)
+        cls._add_record(record)
         return record
 
     # ------------------------------------------------------------
@@ -120,9 +236,9 @@ class BillingSystem:
     # ------------------------------------------------------------
     @classmethod
     def pay_now(cls, customer, package):
-        print("\n=== 即時付款（非合約客戶）===")
+        log.debug("=== 即時付款（非合約客戶）===")
         record = cls.record_payment(customer, package, "Immediate Payment")
-        print(record)
+        log.debug("%s", record)
         return record
 
     # ------------------------------------------------------------
@@ -130,7 +246,7 @@ class BillingSystem:
     # ------------------------------------------------------------
     @classmethod
     def prepaid(cls, customer, package):
-        print("\n=== 預付客戶：不收費 ===")
+        log.debug("=== 預付客戶：不收費 ===")
 
         record = BillingRecord(
             customer_id=customer.customer_id,
@@ -139,8 +255,8 @@ class BillingSystem:
             method="Prepaid"
         )
 
-        cls.all_records.append(record)
-        print(record)
+        cls._add_record(record)
+        log.debug("%s", record)
         return record
 
     # ------------------------------------------------------------
@@ -148,7 +264,7 @@ class BillingSystem:
     # ------------------------------------------------------------
     @classmethod
     def add_to_monthly_bill(cls, customer, package):
-        print("\n=== 月結帳戶：加入帳單 ===")
+        log.debug("=== 月結帳戶：加入帳單 ===")
 
         record = BillingRecord(
             customer_id=customer.customer_id,
@@ -157,16 +273,19 @@ class BillingSystem:
             method="Monthly Billing"
         )
 
-        cls.all_records.append(record)
+        cls._add_record(record)
 
         # 若客戶沒有月結帳單 → 自動建立
-        if customer.customer_id not in cls.monthly_statements:
-            cls.monthly_statements[customer.customer_id] = MonthlyStatement(customer.customer_id)
+        cid = customer.customer_id
+        with cls._lock:
+            stmt = cls.monthly_statements.get(cid)
+            if stmt is None:
+                stmt = cls.monthly_statements[cid] = MonthlyStatement(cid)
 
-        # 加入帳單明細
-        cls.monthly_statements[customer.customer_id].add_record(record)
+            # 加入帳單明細
+            stmt.add_record(record)
 
-        print(record)
+        log.debug("%s", record)
         return record
 
     # ------------------------------------------------------------
@@ -177,7 +296,7 @@ class BillingSystem:
         """
         建立一筆退款紀錄（amount 通常為負值）
         """
-        print("\n=== 處理退款 ===")
+        log.debug("=== 處理退款 ===")
 
         record = BillingRecord(
             customer_id=customer.customer_id,
@@ -187,8 +306,8 @@ class BillingSystem:
             is_refund=True
         )
 
-        cls.all_records.append(record)
-        print(record)
+        cls._add_record(record)
+        log.debug("%s", record)
         return record
 
     # ------------------------------------------------------------
@@ -197,14 +316,46 @@ class BillingSystem:
     @classmethod
     def list_customer_records(cls, customer_id):
         """列出某客戶所有付款紀錄"""
-        return [r for r in cls.all_records if r.customer_id == customer_id]
+        with cls._lock:
+            return list(cls._records_by_customer.get(customer_id, ()))
 
     @classmethod
     def list_all_records(cls):
         """列出系統中所有付款紀錄"""
-        return list(cls.all_records)
+        with cls._lock:
+            return list(cls.all_records)
 
     @classmethod
     def get_monthly_statement(cls, customer_id):
         """取得某客戶的月結帳單"""
         return cls.monthly_statements.get(customer_id)
+
+    # ------------------------------------------------------------
+    # (G) 統計報表（以 NumPy 直接掃描欄位陣列，不逐筆存取 BillingRecord）
+    # ------------------------------------------------------------
+    @classmethod
+    def customer_totals(cls):
+        """各客戶非退款金額總和：customer_id → total"""
+        with cls._lock:
+            totals, _ = _bincount_totals(
+                cls._col_codes, cls._col_amounts, cls._col_refund, len(cls._cust_ids)
+            )
+            return dict(zip(cls._cust_ids, totals))
+
+    @classmethod
+    def monthly_totals(cls, year=None, month=None):
+        """
+        指定月份各客戶非退款金額總和（預設為本月）
+        只回傳該月有紀錄的客戶：customer_id → total
+        """
+        if year is None or month is None:
+            now = datetime.now()
+            year, month = year or now.year, month or now.month
+        key = year * 12 + month - 1
+
+        with cls._lock:
+            totals, counts = _bincount_totals(
+                cls._col_codes, cls._col_amounts, cls._col_refund, len(cls._cust_ids),
+                months=cls._col_month, key=key
+            )
+            return {cid: t for cid, t, n in zip(cls._cust_ids, totals, counts) if n}
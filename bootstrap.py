@@ -0,0 +1,85 @@
+# bootstrap.py
+"""
+bootstrap 模組 — app.py / app_2.py 共用的初始化與常數表
+------------------------------------------------------------
+✔ get_db()：以 st.cache_resource 建立一次，所有 session 共用
+✔ 表單選項 / 顯示用的對照表
+✔ 倉庫、車輛容量由各 app 傳入 get_db()（app.py：10 / 200 kg，app_2.py：50 / 1000 kg），
+  也可用環境變數統一覆寫：
+    SLS_WAREHOUSE_CAPACITY
+    SLS_VEHICLE_CAPACITY（kg）
+✔ SLS_DEBUG=1：開啟核心模組的 debug log（計費明細、狀態流程…）
+------------------------------------------------------------
+"""
+
+import logging
+import os
+import threading
+
+import streamlit as st
+
+from user import User
+from vehicle import Vehicle
+from warehouse import Warehouse
+from service import STANDARD_SERVICE, EXPRESS_OVERNIGHT
+from tracking import TrackingEvent
+
+
+if os.environ.get("SLS_DEBUG") == "1":
+    logging.basicConfig(level=logging.DEBUG, format="%(name)s | %(message)s")
+
+
+# 表單選項 → 後端物件 / 代碼
+SERVICE_MAP = {
+    "標準速遞": STANDARD_SERVICE,
+    "隔夜達": EXPRESS_OVERNIGHT,
+    "經濟速遞（展示）": STANDARD_SERVICE  # 展示用，不影響後端
+}
+SPECIAL_MAP = {
+    "易碎品": "Fragile",
+    "危險物品": "Dangerous"
+}
+
+# Customer 顯示：里程碑狀態與中文名稱
+MILESTONE_SET = TrackingEvent.CUSTOMER_MILESTONES
+STATUS_MAP_ZH = {
+    "Shipment Created": "包裹已建立",
+    "In Transit - Sorting": "倉庫分揀中",
+    "Out for Delivery": "配送中",
+    "Delivered": "已送達"
+}
+
+
+@st.cache_resource
+def get_db(warehouse_capacity: int = 10, vehicle_capacity_kg: float = 200) -> dict:
+    """建立示範用資料（使用者 / 倉庫 / 車輛 / 包裹索引）；容量參數不同即為不同的快取"""
+    admin = User("Admin", "123", "admin")
+    cs = User("Customer_Service", "123", "customer_service")
+    wh_user = User("Warehouse_Staff", "123", "warehouse")
+    driver = User("Driver_Jack", "123", "driver")
+
+    warehouse = Warehouse(
+        "WH-001", "台北總倉",
+        capacity=int(os.environ.get("SLS_WAREHOUSE_CAPACITY", warehouse_capacity))
+    )
+    vehicle = Vehicle(
+        "TRUCK-01", "物流卡車",
+        capacity_kg=float(os.environ.get("SLS_VEHICLE_CAPACITY", vehicle_capacity_kg))
+    )
+    vehicle.assign_driver(driver)
+
+    return {
+        "users": {
+            "admin": admin,
+            "customer_service": cs,
+            "warehouse": wh_user,
+            "driver": driver
+        },
+        "packages": [],
+        "packages_by_tn": {},     # tracking_number → Package（避免線性搜尋）
+        "status_version": 0,      # 包裹狀態每變動一次 +1（表格快取鍵）
+        "active_tns": {},         # 司機待配送 tracking_number（dict 當有序 set 用）
+        "lock": threading.Lock(), # 各 session 共用 db：更新上面的索引 / 計數器時持鎖
+        "warehouse": warehouse,
+        "vehicle": vehicle
+    }
@@ -0,0 +1,42 @@
+# clock.py
+"""
+clock 模組 — 時間戳記的共用工具
+------------------------------------------------------------
+✔ 紀錄建立時只存 time.time_ns() 的整數（不建立 datetime 物件）
+✔ 需要顯示 / 比較時再轉成本地時間的 datetime（取到微秒）
+------------------------------------------------------------
+"""
+
+import time
+from datetime import datetime
+
+_NS = 1_000_000_000
+
+now_ns = time.time_ns
+
+
+def ns_to_datetime(ns):
+    """epoch 奈秒 → 本地時間 datetime（整數運算無條件捨去到微秒，與 datetime.now() 一致）"""
+    sec, rem = divmod(ns, _NS)
+    return datetime.fromtimestamp(sec).replace(microsecond=rem // 1000)
+
+
+def datetime_to_ns(dt):
+    """本地時間 datetime → epoch 奈秒"""
+    return int(dt.replace(microsecond=0).timestamp()) * _NS + dt.microsecond * 1000
+
+
+def ns_lower_bound(dt):
+    """最小的 ns，使 ns_to_datetime(ns) >= dt（區間起點換算用）"""
+    return datetime_to_ns(dt)
+
+
+def ns_upper_bound(dt):
+    """最大的 ns，使 ns_to_datetime(ns) <= dt（區間終點換算用，含同一微秒內的 ns）"""
+    return datetime_to_ns(dt) + 999
+
+
+def month_key(ns):
+    """epoch 奈秒 → 年 * 12 + (月 - 1)（月份分組鍵）"""
+    t = time.localtime(ns // _NS)
+    return t.tm_year * 12 + t.tm_mon - 1
@@ -1,6 +1,11 @@
 # customer.py
+import logging
+import sys
+
 from billing import BillingSystem
 
+log = logging.getLogger(__name__)
+
 
 class Customer:
     """
@@ -16,19 +21,30 @@ class Customer:
     all_customers：模擬資料庫，customer_id → Customer 物件
     """
 
+    __slots__ = (
+        "customer_id", "name", "address", "phone", "email",
+        "customer_type", "billing_preference", "payment_records"
+    )
+
     all_customers = {}
 
+    # customer_type → 付款處理（未列出的類型 → 即時付款）
+    _DISPATCH = {
+        "Prepaid": BillingSystem.prepaid,
+        "Contract": BillingSystem.add_to_monthly_bill,
+    }
+
     def __init__(self, customer_id, name, address, phone, email,
                  customer_type, billing_preference):
         # 基本資料
-        self.customer_id = customer_id
+        self.customer_id = sys.intern(customer_id)
         self.name = name
         self.address = address
         self.phone = phone
         self.email = email
 
         # 客戶類型（決定付款方式）
-        self.customer_type = customer_type            # Non-Contract / Prepaid / Contract
+        self.customer_type = sys.intern(customer_type)  # Non-Contract / Prepaid / Contract
         self.billing_preference = billing_preference  # Credit / Monthly / ...
 
         # 已付款紀錄（BillingRecord）
@@ -52,28 +68,19 @@ class Customer:
     # ------------------------------------------------------------
     def pay_for_package(self, package):
         """
-        根據客戶類型自動分流：
+        根據客戶類型自動分流（查 _DISPATCH 對照表）：
         --------------------------------------------------------
         Prepaid → BillingSystem.prepaid()
         Contract → BillingSystem.add_to_monthly_bill()
-        Non-Contract → BillingSystem.pay_now()
+        Non-Contract（其他）→ BillingSystem.pay_now()
         --------------------------------------------------------
         並將紀錄加入 self.payment_records
         """
 
-        print(f"\n[PAYMENT] {self.name} 的付款流程開始...")
+        log.debug("[PAYMENT] %s 的付款流程開始...", self.name)
 
-        # 1. 預付客戶 → 不收費，但仍需建立紀錄
-        if self.is_prepaid():
-            record = BillingSystem.prepaid(self, package)
-
-        # 2. 合約客戶 → 月結帳單
-        elif self.is_contract():
-            record = BillingSystem.add_to_monthly_bill(self, package)
-
-        # 3. 一般客戶 → 即時付款
-        else:
-            record = BillingSystem.pay_now(self, package)
+        handler = type(self)._DISPATCH.get(self.customer_type, BillingSystem.pay_now)
+        record = handler(self, package)
 
         self.payment_records.append(record)
         return record
@@ -110,6 +117,8 @@ class ContractCustomer(Customer):
     其他邏輯由父類別 Customer 處理
     """
 
+    __slots__ = ()
+
     def __init__(self, customer_id, name, address, phone, email):
         super().__init__(
             customer_id,
@@ -1,4 +1,6 @@
-import uuid
+import logging
+import secrets
+import sys
 from datetime import datetime, timedelta
 from tracking import TrackingEvent
 from service import ServiceType
@@ -6,6 +8,16 @@ from user import User
 from warehouse import Warehouse
 from vehicle import Vehicle
 
+log = logging.getLogger(__name__)
+
+
+def _calc(base, wrate, weight, dist, decl, special_ids, fee_arr):
+    """運費計算核心：special_ids 為 ServiceType.special_codes() 的代碼"""
+    total = base + weight * wrate + dist * 0.5
+    for i in special_ids:
+        total += fee_arr[i]
+    return total + decl * 0.01
+
 
 class Package:
     """
@@ -22,6 +34,13 @@ class Package:
     ------------------------------------------------------------
     """
 
+    __slots__ = (
+        "tracking_number", "customer_id", "weight", "dimensions",
+        "declared_value", "description", "service_type", "special_services",
+        "distance_km", "current_status", "eta", "warehouse_id", "billing_cost",
+        "_special_codes"
+    )
+
     # 模擬資料庫
     all_packages = {}
 
@@ -42,8 +61,8 @@ class Package:
         # ------------------------------------------------------------
         # (1) 基本資料
         # ------------------------------------------------------------
-        self.tracking_number = str(uuid.uuid4().int)[:10]
-        self.customer_id = customer_id
+        self.tracking_number = Package._new_tracking_number()
+        self.customer_id = sys.intern(customer_id)
         self.weight = weight
         self.dimensions = dimensions
         self.declared_value = declared_value
@@ -52,6 +71,9 @@ class Package:
         self.special_services = special_services
         self.distance_km = distance_km
 
+        # 特殊服務名稱只在建立時轉成費用代碼一次（計費時直接索引費用陣列）
+        self._special_codes = service_type.special_codes(special_services)
+
         self.current_status = "Shipment Created"
         self.eta = datetime.now() + timedelta(days=eta_days)
 
@@ -61,7 +83,7 @@ class Package:
         # ------------------------------------------------------------
         # (2) 計費
         # ------------------------------------------------------------
-        self.billing_cost = self._calculate_cost()
+        self.billing_cost = self._calculate_cost()  # 未四捨五入，顯示時以 :.2f 格式化
 
         # ------------------------------------------------------------
         # (3) 加入資料庫
@@ -76,7 +98,7 @@ class Package:
             if wh:
                 wh.add_package(self.tracking_number)
         except Exception as e:
-            print(f"[WARNING] 無法進倉：{e}")
+            log.warning("[WAREHOUSE] 無法進倉：%s", e)
 
         # ------------------------------------------------------------
         # (5) 建立初始事件
@@ -91,38 +113,95 @@ class Package:
             eta=self.eta
         )
 
+    @classmethod
+    def _new_tracking_number(cls):
+        """產生 10 碼 hex 追蹤編號；與既有包裹重複時重抽"""
+        tn = secrets.token_hex(5)
+        while tn in cls.all_packages:
+            tn = secrets.token_hex(5)
+        return tn
+
     # ============================================================
     # (6) 運費計算
     # ============================================================
     def _calculate_cost(self):
-        print(f"\n[COST] 計算包裹 {self.tracking_number} 運費...")
-
-        cost = self.service_type.base_rate
-        print(f"  > 基礎費用：+{self.service_type.base_rate}")
-
-        weight_cost = self.weight * self.service_type.weight_rate
-        cost += weight_cost
-        print(f"  > 重量費用：+{weight_cost}")
+        st = self.service_type
+        cost = _calc(
+            st.base_rate, st.weight_rate, self.weight, self.distance_km,
+            self.declared_value, self._special_codes, st._special_fee_arr
+        )
+        if log.isEnabledFor(logging.DEBUG):
+            self._log_cost_breakdown(cost)
+        return cost
 
-        distance_cost = self.distance_km * 0.5
-        cost += distance_cost
-        print(f"  > 距離費用：+{distance_cost}")
+    def _log_cost_breakdown(self, cost):
+        """DEBUG 時輸出運費明細（只做記錄；金額一律以 _calc 的結果為準）"""
+        st = self.service_type
+        log.debug("[COST] 計算包裹 %s 運費...", self.tracking_number)
+        log.debug("  > 基礎費用：+%s", st.base_rate)
+        log.debug("  > 重量費用：+%s", self.weight * st.weight_rate)
+        log.debug("  > 距離費用：+%s", self.distance_km * 0.5)
 
+        ids, fees = st._special_ids, st._special_fee_arr
         for s in self.special_services:
-            if s in self.service_type.special_fees:
-                fee = self.service_type.special_fees[s]
-                cost += fee
-                print(f"  > 特殊服務 {s}：+{fee}")
+            if s in ids:
+                log.debug("  > 特殊服務 %s：+%s", s, fees[ids[s]])
             else:
-                print(f"  > [警告] 特殊服務 {s} 未設定費用")
+                log.debug("  > [警告] 特殊服務 %s 未設定費用", s)
 
-        insurance_cost = self.declared_value * 0.01
-        cost += insurance_cost
-        print(f"  > 保險費：+{insurance_cost}")
+        log.debug("  > 保險費：+%s", self.declared_value * 0.01)
+        log.debug("[TOTAL] 運費：%.2f", cost)
 
-        cost = round(cost, 2)
-        print(f"[TOTAL] 運費：{cost}")
-        return cost
+    @classmethod
+    def calculate_costs_bulk(cls, weights, distances, declared_values, service_types, specials):
+        """
+        批次計算運費（CSV 匯入 / 夜間批次用），回傳 numpy.ndarray（float64，不四捨五入）
+        ------------------------------------------------------------
+        - 各參數為等長的欄位序列，第 i 筆對應同一個包裹
+        - 服務類型編成代碼，基礎費用 / 重量費率依代碼 gather 成整欄陣列
+        - 特殊服務清單先依組合去重，展開成 (組合數, 特殊服務種類數) 的次數矩陣，
+          乘上費用矩陣得到「組合 × 服務類型」的費用表，再以 (組合, 服務類型) 代碼 gather
+        - 計算式與 _calc 相同；多項特殊費用先加總再併入總額，與逐筆計算可能差在最後一位
+        - 不逐筆寫 log，也不建立 Package 物件
+        ------------------------------------------------------------
+        """
+        import numpy as np   # 只有批次計費用到，核心模組載入時不需要 NumPy
+
+        svc_codes = {}
+        svc = np.array(
+            [svc_codes.setdefault(st, len(svc_codes)) for st in service_types], dtype=np.intp
+        )
+        services = list(svc_codes)
+        base = np.array([st.base_rate for st in services], dtype=float)[svc]
+        wrate = np.array([st.weight_rate for st in services], dtype=float)[svc]
+
+        # 特殊服務名稱 → 欄位；fee_table[s, j]：服務類型 s 的第 j 種特殊服務費用（未設定為 0）
+        names = {}
+        for st in services:
+            for s in st.special_fees:
+                names.setdefault(s, len(names))
+        fee_table = np.zeros((len(services), len(names)))
+        for k, st in enumerate(services):
+            for s, fee in st.special_fees.items():
+                fee_table[k, names[s]] = fee
+
+        # 特殊服務組合 → 代碼（批次內組合種類很少，逐項展開只做一次）
+        combos = {}
+        combo = np.array(
+            [combos.setdefault(tuple(specs), len(combos)) for specs in specials], dtype=np.intp
+        )
+        counts = np.zeros((len(combos), len(names)))
+        for k, specs in enumerate(combos):
+            for s in specs:
+                j = names.get(s)
+                if j is not None:
+                    counts[k, j] += 1
+        combo_fees = counts @ fee_table.T   # [組合, 服務類型] → 特殊費用合計
+
+        total = base + np.asarray(weights, dtype=float) * wrate
+        total += np.asarray(distances, dtype=float) * 0.5
+        total += combo_fees[combo, svc]
+        return total + np.asarray(declared_values, dtype=float) * 0.01
 
     # ============================================================
     # (7) 自動流程：更新包裹狀態
@@ -152,7 +231,7 @@ class Package:
         ------------------------------------------------------------
         """
 
-        print(f"\n[STATUS] {self.tracking_number} → {new_status}")
+        log.debug("[STATUS] %s → %s", self.tracking_number, new_status)
 
         # ------------------------------------------------------------
         # 1. 權限驗證（對應 1.6）
@@ -168,7 +247,7 @@ class Package:
             if old_wh:
                 try:
                     old_wh.remove_package(self.tracking_number)
-                    print(f"[WAREHOUSE] 離開倉庫：{self.warehouse_id}")
+                    log.debug("[WAREHOUSE] 離開倉庫：%s", self.warehouse_id)
                 except:
                     pass
             self.warehouse_id = None
@@ -184,12 +263,12 @@ class Package:
             # ⭐ 自動上車
             if new_status in {"Picked Up", "Out for Delivery"}:
                 vehicle.load_package(self, user)
-                print(f"[VEHICLE] 上車：{vehicle.vehicle_id}")
+                log.debug("[VEHICLE] 上車：%s", vehicle.vehicle_id)
 
             # ⭐ Delivered 自動卸車
             if new_status == "Delivered":
                 vehicle.unload_package(self, location, user)
-                print(f"[VEHICLE] 卸貨：{vehicle.vehicle_id}")
+                log.debug("[VEHICLE] 卸貨：%s", vehicle.vehicle_id)
 
         # ------------------------------------------------------------
         # 4. 進倉（若指定 to_warehouse）
@@ -199,7 +278,7 @@ class Package:
             to_warehouse.add_package(self.tracking_number)
             warehouse_id = to_warehouse.warehouse_id
             self.warehouse_id = warehouse_id
-            print(f"[WAREHOUSE] 進入倉庫：{warehouse_id}")
+            log.debug("[WAREHOUSE] 進入倉庫：%s", warehouse_id)
 
         # ------------------------------------------------------------
         # 5. 更新狀態 / ETA
@@ -223,6 +302,19 @@ class Package:
             exception_type=exception_type
         )
 
+    def bulk_update_status(self, transitions):
+        """
+        連續套用多個狀態（例如 Picked Up → Out for Delivery → Delivered）
+        ------------------------------------------------------------
+        transitions：[(new_status, location, user, vehicle), ...]
+        每一步仍走 update_status() 的完整流程，
+        期間產生的 TrackingEvent（含車輛上車 / 卸貨）最後一次寫入。
+        ------------------------------------------------------------
+        """
+        with TrackingEvent.batch():
+            for new_status, location, user, vehicle in transitions:
+                self.update_status(new_status, location, user, vehicle=vehicle)
+
     # ============================================================
     # 查詢
     # ============================================================
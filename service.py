@@ -1,3 +1,10 @@
+import logging
+from array import array
+from types import MappingProxyType
+
+log = logging.getLogger(__name__)
+
+
 class ServiceType:
     """
     1.2 包裹服務分類與定價規則（教學版）
@@ -7,11 +14,17 @@ class ServiceType:
     - 基礎運費(base_rate)
     - 重量費率(weight_rate)
     - 特殊費用(1.2.6)
+
+    建立後視為常數：special_fees 為唯讀對照表，
+    避免與批次計費用的 _special_ids / _special_fee_arr 不一致。
     """
 
-    def __init__(self, service_id, name, speed, base_rate, weight_rate, special_fees=None):
-        print(f"\n[SERVICE] 建立服務類型：{name}")
+    __slots__ = (
+        "service_id", "name", "speed", "base_rate", "weight_rate",
+        "special_fees", "_special_ids", "_special_fee_arr"
+    )
 
+    def __init__(self, service_id, name, speed, base_rate, weight_rate, special_fees=None):
         self.service_id = service_id
         self.name = name
         self.speed = speed  # 隔夜達、標準、經濟…（1.2.4）
@@ -21,17 +34,30 @@ class ServiceType:
         self.weight_rate = weight_rate
 
         # 特殊費用（危險物、易碎、超大件等）（1.2.6）
-        self.special_fees = special_fees if special_fees is not None else {}
+        self.special_fees = MappingProxyType(dict(special_fees or {}))
 
-        print(f"  > 配送時效：{self.speed}")
-        print(f"  > 基礎費用：{self.base_rate}")
-        print(f"  > 重量費率：{self.weight_rate}")
-        print(f"  > 附加費用表：{self.special_fees}")
+        # 特殊服務名稱 → 小整數代碼，費用依代碼存成連續陣列（批次計費用）
+        self._special_ids = {s: i for i, s in enumerate(self.special_fees)}
+        self._special_fee_arr = array("d", self.special_fees.values())
+
+        log.debug("[SERVICE] 建立服務類型：%r", self)
+
+    def special_codes(self, special_services):
+        """將特殊服務名稱轉成代碼 tuple；未設定費用的項目略過"""
+        ids = self._special_ids
+        return tuple(ids[s] for s in special_services if s in ids)
+
+    def __repr__(self):
+        return (
+            f"ServiceType({self.service_id!r}, {self.name!r}, speed={self.speed!r}, "
+            f"base_rate={self.base_rate}, weight_rate={self.weight_rate}, "
+            f"special_fees={dict(self.special_fees)})"
+        )
 
     def __str__(self):
         return (
             f"[Service {self.name}] Speed={self.speed}, Base={self.base_rate}, "
-            f"WeightRate={self.weight_rate}, Specials={self.special_fees}"
+            f"WeightRate={self.weight_rate}, Specials={dict(self.special_fees)}"
         )
 
 
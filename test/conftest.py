@@ -0,0 +1,37 @@
+#共用測試資料
+
+'''
+session 範圍的 fixture：整個測試過程只建立一次
+- shared_admin：管理員使用者
+- shared_package：唯讀用的包裹（計費 / 付款測試只讀取 tracking_number 與 billing_cost）
+會修改全域狀態的測試（BillingSystem、TrackingEvent）仍各自 reset()
+'''
+
+
+import pytest
+from package import Package
+from service import STANDARD_SERVICE
+from user import User
+from warehouse import Warehouse
+
+
+@pytest.fixture(scope="session")
+def shared_admin():
+    return User("admin", "123", "admin")
+
+
+@pytest.fixture(scope="session")
+def shared_package(shared_admin):
+    Warehouse("W-SHARED", "Shared WH", 1000)
+    return Package(
+        customer_id="C100",
+        weight=10,
+        dimensions=(10, 10, 10),
+        declared_value=200,
+        description="Shared Test",
+        service_type=STANDARD_SERVICE,
+        special_services=[],
+        distance_km=20,
+        created_by=shared_admin,
+        warehouse_id="W-SHARED"
+    )
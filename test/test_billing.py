@@ -8,37 +8,90 @@
 
 
 
-from billing import BillingSystem
+import pytest
+
+from billing import BillingSystem, BillingRecord
 from customer import Customer
-from service import STANDARD_SERVICE
-from package import Package
-from user import User
-from warehouse import Warehouse
-
-
-def setup_package():
-    Warehouse("W-001", "Test", 10)
-    user = User("admin", "123", "admin")
-    return Package(
-        customer_id="C100",
-        weight=10,
-        dimensions=(10, 10, 10),
-        declared_value=200,
-        description="Billing Test",
-        service_type=STANDARD_SERVICE,
-        special_services=[],
-        distance_km=20,
-        created_by=user
-    )
-
-
-def test_pay_now_record_created():
-    BillingSystem.all_records.clear()
+
+
+def test_pay_now_record_created(shared_package):
+    BillingSystem.reset()
 
     cust = Customer("C100", "Tom", "Addr", "123", "t@mail", "Non-Contract", "Cash")
-    pkg = setup_package()
+    pkg = shared_package
 
     record = BillingSystem.pay_now(cust, pkg)
 
     assert record in BillingSystem.all_records
     assert record.amount == pkg.billing_cost
+
+
+def test_list_customer_records_only_returns_that_customer(shared_package):
+    BillingSystem.reset()
+
+    alice = Customer("C100", "Alice", "Addr", "123", "a@mail", "Non-Contract", "Cash")
+    bob = Customer("C200", "Bob", "Addr", "456", "b@mail", "Non-Contract", "Cash")
+    pkg = shared_package
+
+    r1 = BillingSystem.pay_now(alice, pkg)
+    BillingSystem.pay_now(bob, pkg)
+    r3 = BillingSystem.refund(alice, pkg, 10)
+
+    assert BillingSystem.list_customer_records("C100") == [r1, r3]
+    assert BillingSystem.list_customer_records("NOBODY") == []
+
+
+def test_monthly_statement_total_tracks_records(shared_package):
+    BillingSystem.reset()
+
+    cust = Customer("C300", "Carol", "Addr", "789", "c@mail", "Contract", "Monthly")
+    pkg = shared_package
+
+    BillingSystem.add_to_monthly_bill(cust, pkg)
+    BillingSystem.add_to_monthly_bill(cust, pkg)
+    stmt = BillingSystem.get_monthly_statement("C300")
+    assert stmt.total_amount == pkg.billing_cost * 2
+
+    stmt.apply_refund(BillingSystem.refund(cust, pkg, 10))
+    assert stmt.total_amount == pkg.billing_cost * 2 - 10
+
+
+def test_customer_totals_skip_refunds(shared_package):
+    BillingSystem.reset()
+
+    alice = Customer("C100", "Alice", "Addr", "123", "a@mail", "Non-Contract", "Cash")
+    bob = Customer("C200", "Bob", "Addr", "456", "b@mail", "Prepaid", "Cash")
+    pkg = shared_package
+
+    BillingSystem.pay_now(alice, pkg)
+    BillingSystem.pay_now(alice, pkg)
+    BillingSystem.refund(alice, pkg, 10)
+    BillingSystem.prepaid(bob, pkg)
+
+    assert BillingSystem.customer_totals() == {"C100": pkg.billing_cost * 2, "C200": 0.0}
+
+
+def test_monthly_totals_only_count_that_month(shared_package):
+    BillingSystem.reset()
+
+    cust = Customer("C300", "Carol", "Addr", "789", "c@mail", "Contract", "Monthly")
+    pkg = shared_package
+
+    record = BillingSystem.add_to_monthly_bill(cust, pkg)
+    BillingSystem.add_to_monthly_bill(cust, pkg)
+    BillingSystem.refund(cust, pkg, 10)
+    now = record.timestamp
+
+    assert BillingSystem.monthly_totals(now.year, now.month) == {"C300": pkg.billing_cost * 2}
+    assert BillingSystem.monthly_totals(2000, 1) == {}
+
+
+def test_rejected_record_leaves_columns_aligned():
+    BillingSystem.reset()
+
+    BillingSystem._add_record(BillingRecord("C100", "T1", 10.0, "Immediate Payment"))
+    with pytest.raises(ValueError):
+        BillingSystem._add_record(BillingRecord("C200", "T2", "abc", "Immediate Payment"))
+
+    assert len(BillingSystem.all_records) == 1
+    assert BillingSystem.customer_totals() == {"C100": 10.0}
@@ -9,8 +9,10 @@
 
 
 from package import Package
-from service import STANDARD_SERVICE
+from service import STANDARD_SERVICE, EXPRESS_OVERNIGHT
+from tracking import TrackingEvent
 from user import User
+from vehicle import Vehicle
 from warehouse import Warehouse
 
 
@@ -33,3 +35,52 @@ def test_package_creation_and_cost():
     assert pkg.tracking_number is not None
     assert pkg.billing_cost > 0
     assert pkg.current_status == "Shipment Created"
+
+
+def test_bulk_update_status_logs_in_order():
+    Warehouse("W-001", "Main WH", 10)
+    admin = User("admin", "123", "admin")
+    truck = Vehicle("V-TEST", "Truck", capacity_kg=100)
+
+    pkg = Package(
+        customer_id="C001",
+        weight=5,
+        dimensions=(10, 10, 10),
+        declared_value=100,
+        description="Test",
+        service_type=STANDARD_SERVICE,
+        special_services=[],
+        distance_km=50,
+        created_by=admin
+    )
+
+    pkg.bulk_update_status([
+        ("Picked Up", "Dock", admin, truck),
+        ("Out for Delivery", "Road", admin, truck),
+        ("Delivered", "Customer", admin, truck),
+    ])
+
+    statuses = [e.status_description for e in TrackingEvent.get_history(pkg.tracking_number)]
+    milestones = [s for s in statuses if s in {"Picked Up", "Out for Delivery", "Delivered"}]
+
+    assert pkg.current_status == "Delivered"
+    assert milestones == ["Picked Up", "Out for Delivery", "Delivered"]
+    assert statuses.index("Loaded to Vehicle") < statuses.index("Picked Up")
+
+
+def test_calculate_costs_bulk_matches_scalar_path():
+    Warehouse("W-001", "Main WH", 10)
+    user = User("cs", "123", "customer_service")
+    rows = [
+        (5, 50, 100, STANDARD_SERVICE, []),
+        (12.5, 320, 2500, EXPRESS_OVERNIGHT, ["Fragile", "Dangerous"]),
+        (1, 0, 0, STANDARD_SERVICE, ["Oversize", "Unknown"]),
+    ]
+
+    expected = [
+        Package("C001", w, (1, 1, 1), v, "Test", st, sp, d, user).billing_cost
+        for w, d, v, st, sp in rows
+    ]
+    costs = Package.calculate_costs_bulk(*zip(*rows))
+
+    assert costs.tolist() == expected
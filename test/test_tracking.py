@@ -6,12 +6,16 @@
 '''
 
 
+import threading
+
+import pytest
+
 from tracking import TrackingEvent
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 
 def test_tracking_history_order():
-    TrackingEvent.all_events.clear()
+    TrackingEvent.reset()
 
     t = "TRACK-001"
     e1 = TrackingEvent.log_event(t, "A", "Created")
@@ -26,3 +30,190 @@ def test_tracking_history_order():
 
     assert history == [e1, e2, e3]
     assert TrackingEvent.get_current_status(t) == "Delivered"
+
+
+def test_latest_milestone_skips_technical_events():
+    TrackingEvent.reset()
+
+    t = "TRACK-002"
+    TrackingEvent.log_event(t, "WH", "Shipment Created")
+    sorting = TrackingEvent.log_event(t, "WH", "In Transit - Sorting")
+    TrackingEvent.log_event(t, "Truck", "Loaded to Vehicle")
+
+    assert TrackingEvent.latest_milestone(t) is sorting
+    assert TrackingEvent.latest_milestone("NO-SUCH") is None
+
+
+def test_search_by_vehicle_and_warehouse_use_indexes():
+    TrackingEvent.reset()
+
+    e1 = TrackingEvent.log_event("T1", "WH", "Sorting", warehouse_id="W-1")
+    e2 = TrackingEvent.log_event("T1", "Road", "Picked Up", vehicle_id="V-1")
+    e3 = TrackingEvent.log_event("T2", "Road", "Picked Up", vehicle_id="V-1", event_type="Exception")
+
+    assert TrackingEvent.search_by_vehicle("V-1") == [e2, e3]
+    assert TrackingEvent.search_by_warehouse("W-1") == [e1]
+    assert TrackingEvent.search_by_event_type("Exception") == [e3]
+    assert TrackingEvent.search_multi(tracking="T1", vehicle="V-1") == [e2]
+
+
+def test_search_by_date_range_slices_by_time():
+    TrackingEvent.reset()
+
+    e1 = TrackingEvent.log_event("T1", "A", "Created")
+    e2 = TrackingEvent.log_event("T1", "B", "Transit")
+    e3 = TrackingEvent.log_event("T1", "C", "Delivered")
+
+    assert TrackingEvent.search_by_date_range(e2.timestamp, e3.timestamp)[-1] is e3
+    assert e2 in TrackingEvent.search_by_date_range(e2.timestamp, e3.timestamp)
+    assert TrackingEvent.search_by_date_range(e1.timestamp, e3.timestamp) == [e1, e2, e3]
+    assert TrackingEvent.search_by_date_range(datetime(2000, 1, 1), datetime(2000, 1, 2)) == []
+
+    # 事後改時間打亂時間欄位：改逐筆比對，不能再二分搜尋
+    e1.timestamp += timedelta(hours=1)
+    assert TrackingEvent.search_by_date_range(e2.timestamp, e3.timestamp) == [e2, e3]
+    assert TrackingEvent.search_multi(date_start=e2.timestamp, date_end=e3.timestamp) == [e2, e3]
+
+
+def test_check_consistency_counts_time_regressions():
+    TrackingEvent.reset()
+
+    e1 = TrackingEvent.log_event("T1", "A", "Created")
+    e2 = TrackingEvent.log_event("T1", "B", "Transit")
+    TrackingEvent.log_event("T2", "C", "Created")
+    assert TrackingEvent.check_consistency() == 0
+
+    e2.timestamp = e1.timestamp - timedelta(minutes=1)
+    assert TrackingEvent.check_consistency() == 1
+    assert TrackingEvent.get_history("T1") == [e2, e1]
+    assert TrackingEvent.get_current_status("T1") == "Created"
+
+
+def test_log_events_writes_rows_in_order():
+    TrackingEvent.reset()
+
+    events = TrackingEvent.log_events([
+        {"tracking_number": "T1", "location": "WH", "status_description": "Shipment Created"},
+        {"tracking_number": "T1", "location": "Road", "status_description": "Out for Delivery", "vehicle_id": "V-1"},
+        {"tracking_number": "T2", "location": "WH"},
+    ])
+
+    assert len(events) == 2
+    assert TrackingEvent.get_history("T1") == events
+    assert TrackingEvent.search_by_vehicle("V-1") == events[1:]
+    assert TrackingEvent.latest_milestone("T1") is events[1]
+    assert len(TrackingEvent.error_logs) == 1
+
+
+def test_search_by_eta_range_sorted_by_eta():
+    TrackingEvent.reset()
+
+    day = datetime(2025, 1, 1)
+    late = TrackingEvent.log_event("T1", "A", "Created", eta=day + timedelta(days=3))
+    early = TrackingEvent.log_event("T2", "B", "Created", eta=day + timedelta(days=1))
+    TrackingEvent.log_event("T3", "C", "Created")
+    mid = TrackingEvent.log_event("T4", "D", "Created", eta=day + timedelta(days=2))
+
+    assert TrackingEvent.search_by_eta_range(day, day + timedelta(days=3)) == [early, mid, late]
+    assert TrackingEvent.search_by_eta_range(day + timedelta(days=2), day + timedelta(days=2)) == [mid]
+
+
+def test_coded_columns_decode_and_filter():
+    TrackingEvent.reset()
+
+    a = TrackingEvent.log_event("T1", "A", "Created", vehicle_id="V-1", warehouse_id="W-1")
+    b = TrackingEvent.log_event("T1", "B", "Moved", vehicle_id="V-2", event_type="Exception")
+
+    assert (a.vehicle_id, a.warehouse_id, a.event_type) == ("V-1", "W-1", "Transit")
+    assert (b.vehicle_id, b.warehouse_id, b.event_type) == ("V-2", None, "Exception")
+    assert TrackingEvent.search_multi(tracking="T1", vehicle="V-2") == [b]
+    assert TrackingEvent.search_multi(tracking="T1", warehouse="W-9") == []
+
+    TrackingEvent.reset()
+    c = TrackingEvent.log_event("T2", "C", "Created", vehicle_id="V-2")
+    assert c.vehicle_id == "V-2" and c.warehouse_id is None
+
+
+def test_bare_event_and_bad_row_leave_columns_aligned():
+    TrackingEvent.reset()
+
+    blank = TrackingEvent.log_event("T1", None, "Created")
+    stray = TrackingEvent("X", "Nowhere", "Created")
+    alpha = TrackingEvent.log_event("T2", "Alpha", "Created")
+
+    assert blank.location is None and stray.idx is None
+    assert [e.idx for e in TrackingEvent.all_events] == [0, 1]
+    assert TrackingEvent.search_by_location("alpha") == [alpha]
+    assert TrackingEvent.search_by_location("nowhere") == []
+
+
+def test_eta_change_moves_event_in_eta_index():
+    TrackingEvent.reset()
+
+    day = datetime(2025, 1, 1)
+    e = TrackingEvent.log_event("T1", "A", "Created", eta=day)
+    e.eta = day + timedelta(days=5)
+
+    assert TrackingEvent.search_by_eta_range(day, day) == []
+    assert TrackingEvent.search_by_eta_range(day, day + timedelta(days=5)) == [e]
+    e.eta = None
+    assert TrackingEvent.eta_sorted == []
+
+
+def test_batch_only_defers_own_thread():
+    TrackingEvent.reset()
+
+    entered, release = threading.Event(), threading.Event()
+    out = {}
+
+    def batched():
+        with TrackingEvent.batch():
+            out["a"] = TrackingEvent.log_event("A", "WH", "Shipment Created")
+            entered.set()
+            release.wait(5)
+
+    def direct():
+        entered.wait(5)
+        out["b"] = TrackingEvent.log_event("B", "WH", "Shipment Created")
+
+    ta, tb = threading.Thread(target=batched), threading.Thread(target=direct)
+    ta.start(); tb.start()
+    tb.join(5)
+
+    # A 還在 batch() 之中：B 的事件已立即寫入，A 的還在暫存
+    assert out["b"].idx == 0
+    assert TrackingEvent.get_history("B") == [out["b"]]
+    assert TrackingEvent.latest_milestone("B") is out["b"]
+    assert TrackingEvent.get_history("A") == []
+
+    release.set()
+    ta.join(5)
+    assert TrackingEvent.get_history("A") == [out["a"]]
+    assert [e.idx for e in TrackingEvent.all_events] == [0, 1]
+
+
+def test_indexed_fields_are_read_only_once_logged():
+    TrackingEvent.reset()
+
+    draft = TrackingEvent("T1", "A", "Created", vehicle_id="V1")
+    draft.vehicle_id = "V2"   # 尚未寫入：可修改
+    assert draft.vehicle_id == "V2"
+
+    e = TrackingEvent.log_event("T1", "A", "Created", vehicle_id="V1")
+    for field, value in (("vehicle_id", "V2"), ("tracking_number", "T9"), ("status_description", "Lost")):
+        with pytest.raises(AttributeError):
+            setattr(e, field, value)
+    assert TrackingEvent.search_by_vehicle("V1") == [e]
+
+
+def test_eta_normalised_or_rejected_before_logging():
+    TrackingEvent.reset()
+
+    a = TrackingEvent.log_event("T1", "A", "Created", eta=datetime(2025, 1, 2))
+    b = TrackingEvent.log_event("T2", "B", "Created", eta=date(2025, 1, 1))
+    bad = TrackingEvent.log_event("T3", "C", "Created", eta="2025-01-03")
+
+    assert b.eta == datetime(2025, 1, 1)
+    assert bad is None and len(TrackingEvent.error_logs) == 1
+    assert TrackingEvent.all_events == [a, b]
+    assert TrackingEvent.search_by_eta_range(datetime(2025, 1, 1), datetime(2025, 1, 3)) == [b, a]
@@ -0,0 +1,30 @@
+#測試vehicle
+
+'''
+1. 車輛相關事件是否能正確查詢。
+2. 查詢結果被呼叫端修改時，不影響之後的查詢。
+3. 有新事件寫入後，載運過的包裹清單是否正確更新。
+'''
+
+
+from tracking import TrackingEvent
+from vehicle import Vehicle
+
+
+def test_vehicle_queries_return_fresh_lists():
+    TrackingEvent.reset()
+    truck = Vehicle("V-TEST", "Truck", capacity_kg=100)
+
+    e1 = TrackingEvent.log_event("T2", "Road", "Out for Delivery", vehicle_id="V-TEST")
+    e2 = TrackingEvent.log_event("T1", "Road", "Out for Delivery", vehicle_id="V-TEST")
+
+    events = truck.vehicle_activity()
+    events.clear()
+    assert truck.vehicle_activity() == [e1, e2]
+
+    assigned = truck.list_assigned_packages()
+    assigned.append("X")
+    assert truck.list_assigned_packages() == ["T1", "T2"]
+
+    TrackingEvent.log_event("T3", "Road", "Out for Delivery", vehicle_id="V-TEST")
+    assert truck.list_assigned_packages() == ["T1", "T2", "T3"]
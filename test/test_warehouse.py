@@ -17,3 +17,17 @@ def test_warehouse_capacity_limit():
 
     with pytest.raises(ValueError):
         wh.add_package("PKG-2")
+
+
+def test_list_packages_stays_sorted_after_changes():
+    wh = Warehouse("W-SORT", "Test", capacity=5)
+    for tn in ("PKG-3", "PKG-1", "PKG-2"):
+        wh.add_package(tn)
+
+    listed = wh.list_packages()
+    assert listed == ["PKG-1", "PKG-2", "PKG-3"]
+
+    listed.clear()   # 回傳的是複本，不影響快取
+    wh.remove_package("PKG-2")
+    wh.add_package("PKG-0")
+    assert wh.list_packages() == ["PKG-0", "PKG-1", "PKG-3"]
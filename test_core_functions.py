@@ -40,7 +40,7 @@ def clean_tracking_events():
     每次測試前清空 TrackingEvent 資料，
     確保測試彼此獨立、不互相影響。
     """
-    TrackingEvent.all_events.clear()
+    TrackingEvent.reset()
     return TrackingEvent.all_events
 
 
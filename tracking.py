@@ -1,4 +1,80 @@
-from datetime import datetime
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from contextlib import contextmanager
+from heapq import merge
+from operator import attrgetter
+from datetime import date, datetime, time
+
+from clock import now_ns, ns_to_datetime, datetime_to_ns, ns_lower_bound, ns_upper_bound
+
+
+def _column(col, k, indexed=False):
+    """
+    由欄位 list 產生屬性：已寫入的事件讀寫 col[self.idx]，尚未寫入的讀寫 self._row[k]
+    indexed=True：欄位有衍生索引（by_tracking 等），寫入後改為唯讀
+    """
+    def fget(self):
+        i = self.idx
+        return self._row[k] if i is None else col[i]
+
+    def fset(self, value):
+        i = self.idx
+        if i is None:
+            self._row[k] = value
+        elif indexed:
+            raise AttributeError("事件寫入後不能修改已建立索引的欄位")
+        else:
+            col[i] = value
+
+    return property(fget, fset)
+
+
+def _as_eta(eta):
+    """
+    ETA 統一成本地時間的 naive datetime（date 視為當天 00:00，帶時區的轉成本地時間）
+    其他型別無法與 eta_sorted 內的 ETA 比較，建立時即拒絕（由 log_event 記錄錯誤）
+    """
+    if eta is None:
+        return None
+    if isinstance(eta, datetime):
+        return eta.astimezone().replace(tzinfo=None) if eta.tzinfo is not None else eta
+    if isinstance(eta, date):
+        return datetime.combine(eta, time())
+    raise TypeError(f"ETA 必須是 datetime，收到 {type(eta).__name__}")
+
+
+def _lower(location):
+    """地點搜尋用的小寫字串（location 為 None 時視為空字串，搜尋不會命中）"""
+    return location.lower() if location is not None else ""
+
+
+def _encode(codes, values, value):
+    """字串 → 整數代碼（第一次出現時配發新代碼，values[code] 可反查）"""
+    code = codes.get(value)
+    if code is None:
+        code = codes[value] = len(values)
+        values.append(value)
+    return code
+
+
+def _coded_column(col, k, codes, values):
+    """
+    字典編碼欄位的屬性：col（或 self._row[k]）存代碼，讀取時經 values 解回字串
+    這些欄位都有衍生索引（by_vehicle 等），寫入後為唯讀
+    """
+    def fget(self):
+        i = self.idx
+        return values[self._row[k] if i is None else col[i]]
+
+    def fset(self, value):
+        if self.idx is not None:
+            raise AttributeError("事件寫入後不能修改已建立索引的欄位")
+        with TrackingEvent._lock:
+            self._row[k] = _encode(codes, values, value)
+
+    return property(fget, fset)
 
 
 class TrackingEvent:
@@ -13,14 +89,96 @@ class TrackingEvent:
     ✓ 錯誤紀錄（資料保護與安全性 2.4）
     ✓ 一致性檢查（確保事件排序與資料完整性）
     ---------------------------------------------------
+    欄位式儲存：
+    - 每個欄位是一個 class-level list（_col_*），第 i 筆 = 第 i 個建立的事件
+    - TrackingEvent 物件只保存 idx，屬性讀寫都轉到對應欄位
+    - 時間欄位存 epoch 奈秒整數；timestamp 屬性讀寫時才與 datetime 互轉
+    - vehicle_id / warehouse_id / event_type 種類少，欄位只存整數代碼（array('I')），
+      _*_codes：值 → 代碼，_*_values：代碼 → 值（代碼 0 固定為 None）
+    - 已寫入 all_events 的事件滿足 all_events[i].idx == i
+    - 直接建立（未經 log_event）的事件 idx 為 None，欄位值暫存在 _row，不佔欄位
+    - 有衍生索引的欄位（tracking_number / status_description / vehicle_id /
+      warehouse_id / event_type）寫入後唯讀；timestamp / eta 的 setter 會同步更新索引
+    - _lock：Streamlit 各 session 在不同執行緒寫入，配發 idx + 寫入欄位 + 更新索引需持鎖
+    ---------------------------------------------------
     """
 
+    __slots__ = ("idx", "_row")
+
+    _lock = threading.RLock()
+
+    # 事件欄位（reset() 清空，物件本身不替換）；宣告順序 = _row 的欄位順序
+    _col_tracking = []
+    _col_timestamp = []     # epoch 奈秒（int）
+    _col_location = []
+    _col_location_lower = []   # location.lower()（地點搜尋用，建立時算一次）
+    _col_status = []
+    _col_user = []
+    _col_vehicle = array("I")      # 代碼（見 _veh_codes / _veh_values）
+    _col_warehouse = array("I")    # 代碼（見 _wh_codes / _wh_values）
+    _col_event_type = array("I")   # 代碼（見 _type_codes / _type_values）
+    _col_eta = []
+    _col_exception = []
+
+    _columns = (
+        _col_tracking, _col_timestamp, _col_location, _col_location_lower,
+        _col_status, _col_user, _col_vehicle, _col_warehouse,
+        _col_event_type, _col_eta, _col_exception
+    )
+
+    # 字典編碼表（reset() 還原成只有 None 的狀態）
+    _veh_codes, _veh_values = {None: 0}, [None]
+    _wh_codes, _wh_values = {None: 0}, [None]
+    _type_codes, _type_values = {None: 0}, [None]
+
+    tracking_number = _column(_col_tracking, 0, indexed=True)
+    status_description = _column(_col_status, 4, indexed=True)
+    user = _column(_col_user, 5)
+    vehicle_id = _coded_column(_col_vehicle, 6, _veh_codes, _veh_values)
+    warehouse_id = _coded_column(_col_warehouse, 7, _wh_codes, _wh_values)
+    event_type = _coded_column(_col_event_type, 8, _type_codes, _type_values)
+    exception_type = _column(_col_exception, 10)
+
     # 所有事件的暫存資料庫（模擬 DB）
     all_events = []
 
     # 系統級錯誤紀錄
     error_logs = []
 
+    # 批次寫入暫存：每個執行緒各自一份（_local.pending，None = 目前不在 batch() 之中），
+    # 其他 session 的寫入不會被併入這個執行緒的批次
+    _local = threading.local()
+
+    # Customer 看得到的業務里程碑
+    CUSTOMER_MILESTONES = frozenset({
+        "Shipment Created",
+        "In Transit - Sorting",
+        "Out for Delivery",
+        "Delivered"
+    })
+
+    # tracking_number → 最新一筆里程碑事件（O(1) 取最新狀態）
+    _latest_milestone = {}
+
+    # tracking_number → 該包裹的事件（依寫入順序，即時間順序）
+    by_tracking = defaultdict(list)
+
+    # 寫入時發現時間倒退（系統時鐘回撥 / 多執行緒交錯）的 tracking_number，
+    # 只有這些包裹的 get_history() 需要重新排序
+    _unordered = set()
+
+    # 時間欄位是否曾出現倒退（True 時日期區間查詢不能二分搜尋，改逐筆比對）
+    _ts_unsorted = False
+
+    # vehicle_id / warehouse_id / event_type → 事件（None 不建索引）
+    # 索引皆為 defaultdict(list)：寫入時直接 append，查詢一律用 .get() 以免插入空清單
+    by_vehicle = defaultdict(list)
+    by_warehouse = defaultdict(list)
+    by_event_type = defaultdict(list)
+
+    # (eta, idx) 依 ETA 排序（只收有 ETA 的事件，供 ETA 區間查詢）
+    eta_sorted = []
+
     def __init__(
         self,
         tracking_number,
@@ -47,22 +205,84 @@ class TrackingEvent:
         exception_type  : str       異常類型（損毀/遺失）
         """
 
-        self.event_id = len(TrackingEvent.all_events) + 1
-        self.tracking_number = tracking_number
-        self.timestamp = datetime.now()  # 即時紀錄事件時間 1.4.11
-
-        self.location = location
-        self.status_description = status_description
-        self.user = user
+        # 衍生值（小寫地點、字典代碼）全部先算好放進 _row；
+        # 這裡出錯不會動到任何欄位，寫入由 _store() 一次完成
+        cls = TrackingEvent
+        with cls._lock:
+            self._row = [
+                tracking_number,
+                now_ns(),  # 即時紀錄事件時間 1.4.11
+                location,
+                _lower(location),
+                status_description,
+                user,
 
-        # 原有欄位
-        self.vehicle_id = vehicle_id
-        self.warehouse_id = warehouse_id
+                # 原有欄位
+                _encode(cls._veh_codes, cls._veh_values, vehicle_id),
+                _encode(cls._wh_codes, cls._wh_values, warehouse_id),
 
-        # 🔥 新欄位
-        self.event_type = event_type
-        self.eta = eta
-        self.exception_type = exception_type
+                # 🔥 新欄位
+                _encode(cls._type_codes, cls._type_values, event_type),
+                _as_eta(eta),
+                exception_type
+            ]
+        self.idx = None
+
+    @property
+    def event_id(self):
+        return None if self.idx is None else self.idx + 1
+
+    @property
+    def timestamp(self):
+        i = self.idx
+        return ns_to_datetime(self._row[1] if i is None else TrackingEvent._col_timestamp[i])
+
+    @timestamp.setter
+    def timestamp(self, value):
+        ns = datetime_to_ns(value)
+        if self.idx is None:
+            self._row[1] = ns
+            return
+        TrackingEvent._col_timestamp[self.idx] = ns
+        # 事後改時間可能打亂順序：該包裹的歷史改為查詢時排序，日期查詢改逐筆比對
+        TrackingEvent._unordered.add(self.tracking_number)
+        TrackingEvent._ts_unsorted = True
+
+    @property
+    def eta(self):
+        i = self.idx
+        return self._row[9] if i is None else TrackingEvent._col_eta[i]
+
+    @eta.setter
+    def eta(self, value):
+        value = _as_eta(value)
+        i = self.idx
+        if i is None:
+            self._row[9] = value
+            return
+        cls = TrackingEvent
+        with cls._lock:
+            # eta_sorted 同步移除舊的 (eta, idx)、插入新的，ETA 區間查詢才不會用到舊值
+            old = cls._col_eta[i]
+            if old is not None:
+                pos = bisect_left(cls.eta_sorted, (old, i))
+                del cls.eta_sorted[pos]
+            cls._col_eta[i] = value
+            if value is not None:
+                insort(cls.eta_sorted, (value, i))
+
+    @property
+    def location(self):
+        i = self.idx
+        return self._row[2] if i is None else TrackingEvent._col_location[i]
+
+    @location.setter
+    def location(self, value):
+        if self.idx is None:
+            self._row[2:4] = value, _lower(value)
+            return
+        TrackingEvent._col_location[self.idx] = value
+        TrackingEvent._col_location_lower[self.idx] = _lower(value)
 
     # ============================================================
     # （A）錯誤處理系統
@@ -98,76 +318,286 @@ class TrackingEvent:
         """
         建立一筆新的追蹤事件（1.4.9）
         """
-        try:
-            event = TrackingEvent(
-                tracking_number,
-                location,
-                status_description,
-                user=user,
-                vehicle_id=vehicle_id,
-                warehouse_id=warehouse_id,
-                event_type=event_type,
-                eta=eta,
-                exception_type=exception_type
-            )
-            cls.all_events.append(event)
+        with cls._lock:
+            try:
+                event = TrackingEvent(
+                    tracking_number,
+                    location,
+                    status_description,
+                    user=user,
+                    vehicle_id=vehicle_id,
+                    warehouse_id=warehouse_id,
+                    event_type=event_type,
+                    eta=eta,
+                    exception_type=exception_type
+                )
+            except Exception as e:
+                cls.log_error(tracking_number, f"事件建立失敗：{str(e)}")
+                return None
+
+            pending = getattr(cls._local, "pending", None)
+            if pending is not None:
+                pending.append(event)
+            else:
+                cls._store((event,))
+                cls.all_events.append(event)
+                cls._index_event(event)
             return event
 
-        except Exception as e:
-            cls.log_error(tracking_number, f"事件建立失敗：{str(e)}")
-            return None
+    @classmethod
+    @contextmanager
+    def batch(cls):
+        """
+        批次寫入：區塊內的 log_event() 先暫存，離開時一次 extend 進 all_events。
+        事件仍依建立順序排列；巢狀使用時由最外層統一寫入。
+        暫存只屬於目前的執行緒，其他執行緒的寫入照常立即生效。
+        """
+        local = cls._local
+        if getattr(local, "pending", None) is not None:
+            yield
+            return
+
+        local.pending = []
+        try:
+            yield
+        finally:
+            with cls._lock:
+                pending, local.pending = local.pending, None
+                cls._store(pending)
+                cls.all_events.extend(pending)
+                cls._index_events(pending)
+
+    @classmethod
+    def log_events(cls, rows):
+        """
+        一次寫入多筆事件（rows：log_event() 參數組成的 dict）
+        ------------------------------------------------------------
+        - 全部建立後一次 extend 進 all_events，再批次更新索引
+        - 在 batch() 之中則併入暫存，由 batch() 統一寫入
+        - 單筆建立失敗只記錄錯誤，不影響其他筆
+        回傳成功建立的事件（依 rows 順序）
+        ------------------------------------------------------------
+        """
+        events = []
+        with cls._lock:
+            for row in rows:
+                try:
+                    events.append(TrackingEvent(**row))
+                except Exception as e:
+                    cls.log_error(row.get("tracking_number"), f"事件建立失敗：{str(e)}")
+
+            pending = getattr(cls._local, "pending", None)
+            if pending is not None:
+                pending.extend(events)
+            else:
+                cls._store(events)
+                cls.all_events.extend(events)
+                cls._index_events(events)
+        return events
+
+    @classmethod
+    def _store(cls, events):
+        """
+        替尚未寫入的事件配發 idx，把 _row 一次併入各欄位（呼叫端須持有 _lock）
+        _row 已在建立時算好，這裡不會在寫到一半時出錯，欄位長度永遠一致
+        """
+        idx = len(cls._col_tracking)
+        rows = []
+        for event in events:
+            rows.append(event._row)
+            event.idx, event._row = idx, None
+            idx += 1
+        for col, values in zip(cls._columns, zip(*rows)):
+            col.extend(values)
+
+    @classmethod
+    def _index_event(cls, event):
+        """事件正式寫入 all_events 後，同步更新衍生索引"""
+        cls._index_events((event,))
+
+    @classmethod
+    def _index_events(cls, events):
+        """批次更新衍生索引（欄位與索引 dict 先取成區域變數，迴圈內不再查 cls）"""
+        col_tn, col_status, col_ts = cls._col_tracking, cls._col_status, cls._col_timestamp
+        unordered = cls._unordered
+        col_vehicle, col_warehouse, col_type = cls._col_vehicle, cls._col_warehouse, cls._col_event_type
+        veh_values, wh_values, type_values = cls._veh_values, cls._wh_values, cls._type_values
+        by_tracking, by_vehicle, by_warehouse, by_type = (
+            cls.by_tracking, cls.by_vehicle, cls.by_warehouse, cls.by_event_type
+        )
+        milestones, latest = cls.CUSTOMER_MILESTONES, cls._latest_milestone
+        col_eta, eta_sorted = cls._col_eta, cls.eta_sorted
+
+        if events and not cls._ts_unsorted:
+            # 事件依 idx 連續寫入：與前一筆比較即可判斷時間欄位是否仍遞增
+            first = events[0].idx
+            prev = col_ts[first - 1] if first else None
+            for event in events:
+                ts = col_ts[event.idx]
+                if prev is not None and ts < prev:
+                    cls._ts_unsorted = True
+                    break
+                prev = ts
+
+        for event in events:
+            i = event.idx
+            tn = col_tn[i]
+            history = by_tracking[tn]
+            if history and col_ts[history[-1].idx] > col_ts[i]:
+                unordered.add(tn)
+            history.append(event)
+            code = col_vehicle[i]
+            if code:
+                by_vehicle[veh_values[code]].append(event)
+            code = col_warehouse[i]
+            if code:
+                by_warehouse[wh_values[code]].append(event)
+            by_type[type_values[col_type[i]]].append(event)
+            if col_status[i] in milestones:
+                latest[tn] = event
+            eta = col_eta[i]
+            if eta is not None:
+                insort(eta_sorted, (eta, i))
+
+    @classmethod
+    def reset(cls):
+        """清空所有事件、錯誤紀錄與索引（測試 / 重新初始化用）"""
+        with cls._lock:
+            cls.all_events.clear()
+            cls.error_logs.clear()
+            cls._latest_milestone.clear()
+            cls.by_tracking.clear()
+            cls._unordered.clear()
+            cls._ts_unsorted = False
+            cls.by_vehicle.clear()
+            cls.by_warehouse.clear()
+            cls.by_event_type.clear()
+            cls.eta_sorted.clear()
+            for col in cls._columns:
+                del col[:]
+            for codes, values in (
+                (cls._veh_codes, cls._veh_values),
+                (cls._wh_codes, cls._wh_values),
+                (cls._type_codes, cls._type_values)
+            ):
+                codes.clear()
+                codes[None] = 0
+                del values[1:]
 
     # ============================================================
     # （C）查詢事件歷史（1.4.13）
     # ============================================================
     @classmethod
     def get_history(cls, tracking_number):
-        return sorted(
-            [e for e in cls.all_events if e.tracking_number == tracking_number],
-            key=lambda e: e.timestamp
-        )
+        # 事件依建立順序寫入（batch() 也保留順序），索引內已是時間順序，不必再排序；
+        # 只有寫入時偵測到時間倒退的包裹才排序（穩定排序，同時間保留寫入順序）
+        events = cls.by_tracking.get(tracking_number, ())
+        if tracking_number in cls._unordered:
+            col = cls._col_timestamp
+            return sorted(events, key=lambda e: col[e.idx])
+        return list(events)
 
     # ============================================================
     # （D）查詢最新狀態（1.4.12）
     # ============================================================
     @classmethod
     def get_current_status(cls, tracking_number):
-        history = cls.get_history(tracking_number)
+        # 時間順序被打亂的包裹與 get_history() 一致，取排序後的最後一筆
+        if tracking_number in cls._unordered:
+            history = cls.get_history(tracking_number)
+        else:
+            history = cls.by_tracking.get(tracking_number)
         return history[-1].status_description if history else None
 
+    @classmethod
+    def latest_milestone(cls, tracking_number):
+        """最新一筆 Customer 里程碑事件（不掃描歷史）；沒有則回傳 None"""
+        return cls._latest_milestone.get(tracking_number)
+
     # ============================================================
     # （E）多種搜尋條件（1.4.14）
     # ============================================================
     @classmethod
     def search_by_tracking(cls, tracking_number):
-        return [e for e in cls.all_events if e.tracking_number == tracking_number]
+        return list(cls.by_tracking.get(tracking_number, ()))
 
     @classmethod
     def search_by_location(cls, keyword):
-        return [e for e in cls.all_events if keyword.lower() in e.location.lower()]
+        keyword = keyword.lower()
+        events = cls.all_events
+        locations = cls._col_location_lower
+        return [events[i] for i in range(len(events)) if keyword in locations[i]]
 
     @classmethod
     def search_by_vehicle(cls, vehicle_id):
-        return [e for e in cls.all_events if e.vehicle_id == vehicle_id]
+        return list(cls.by_vehicle.get(vehicle_id, ()))
 
     @classmethod
     def search_by_warehouse(cls, warehouse_id):   # 🔥 新增
-        return [e for e in cls.all_events if e.warehouse_id == warehouse_id]
+        return list(cls.by_warehouse.get(warehouse_id, ()))
+
+    @classmethod
+    def search_by_event_type(cls, event_type):
+        return list(cls.by_event_type.get(event_type, ()))
 
     @classmethod
     def search_by_customer(cls, customer_id, package_dict):
         """
         package_dict：通常為 Package.all_packages
+        各包裹的事件由 by_tracking 取出，再依 event_id 合併回建立順序
         """
-        tnums = [
+        tnums = {
             pkg.tracking_number for pkg in package_dict.values()
             if pkg.customer_id == customer_id
-        ]
-        return [e for e in cls.all_events if e.tracking_number in tnums]
+        }
+        return list(merge(
+            *(cls.by_tracking.get(tn, ()) for tn in tnums),
+            key=attrgetter("event_id")
+        ))
 
     @classmethod
     def search_by_date_range(cls, start, end):
-        return [e for e in cls.all_events if start <= e.timestamp <= end]
+        bounds = cls._date_bounds(start, end)
+        if bounds is None:
+            start, end = cls._ns_range(start, end)
+            col = cls._col_timestamp
+            return [e for e in cls.all_events if start <= col[e.idx] <= end]
+        lo, hi = bounds
+        return cls.all_events[lo:hi]
+
+    @staticmethod
+    def _ns_range(start, end):
+        """
+        start / end → epoch 奈秒的閉區間
+        可為 datetime（與 timestamp 屬性同樣取到微秒比較）或 epoch 奈秒
+        """
+        if isinstance(start, datetime):
+            start = ns_lower_bound(start)
+        if isinstance(end, datetime):
+            end = ns_upper_bound(end)
+        return start, end
+
+    @classmethod
+    def _date_bounds(cls, start, end):
+        """
+        日期區間 → all_events 的索引範圍 [lo, hi)
+        時間欄位依 idx 遞增時才能二分搜尋；曾出現倒退（_ts_unsorted）則回傳 None
+        """
+        if cls._ts_unsorted:
+            return None
+        start, end = cls._ns_range(start, end)
+        n = len(cls.all_events)
+        lo = bisect_left(cls._col_timestamp, start, 0, n)
+        hi = bisect_right(cls._col_timestamp, end, lo, n)
+        return lo, hi
+
+    @classmethod
+    def search_by_eta_range(cls, start, end):
+        """ETA 落在 [start, end] 的事件（依 ETA 排序）"""
+        lo = bisect_left(cls.eta_sorted, (start,))
+        hi = bisect_right(cls.eta_sorted, (end, float("inf")), lo)
+        events = cls.all_events
+        return [events[i] for _, i in cls.eta_sorted[lo:hi]]
 
     @classmethod
     def search_multi(
@@ -184,32 +614,96 @@ class TrackingEvent:
     ):
         """
         複合搜尋（多條件 AND）
+        ---------------------------------------------------
+        1. 每個有索引的條件先算出候選筆數：
+           tracking / customer / vehicle / warehouse → 索引清單長度
+           日期區間 → 二分搜尋得到的 idx 範圍大小（時間欄位曾倒退時改為逐筆比對時間）
+        2. 以候選最少的條件為起點，其餘條件只在這份清單上過濾
+           （日期區間化為 lo <= idx < hi 的整數比較；location 子字串比對放最後）
+        ---------------------------------------------------
         """
-        result = cls.all_events
-
+        postings = {}   # 條件 → 索引清單
         if tracking:
-            result = [e for e in result if e.tracking_number == tracking]
-
+            postings["tracking"] = cls.by_tracking.get(tracking, ())
         if customer_id and package_dict:
-            tnums = [
+            tnums = {
                 pkg.tracking_number for pkg in package_dict.values()
                 if pkg.customer_id == customer_id
-            ]
-            result = [e for e in result if e.tracking_number in tnums]
-
-        if location:
-            result = [e for e in result if location.lower() in e.location.lower()]
-
+            }
+            postings["customer"] = [cls.by_tracking.get(tn, ()) for tn in tnums]
         if vehicle:
-            result = [e for e in result if e.vehicle_id == vehicle]
-
+            postings["vehicle"] = cls.by_vehicle.get(vehicle, ())
         if warehouse:
-            result = [e for e in result if e.warehouse_id == warehouse]   # 🔥 新增
+            postings["warehouse"] = cls.by_warehouse.get(warehouse, ())   # 🔥 新增
 
+        sizes = {
+            name: sum(map(len, lst)) if name == "customer" else len(lst)
+            for name, lst in postings.items()
+        }
+        ts_range = None   # 時間欄位非遞增時，日期條件改為逐筆比對時間
         if date_start and date_end:
-            result = [e for e in result if date_start <= e.timestamp <= date_end]
-
-        return result
+            bounds = cls._date_bounds(date_start, date_end)
+            if bounds is None:
+                ts_range = cls._ns_range(date_start, date_end)
+            else:
+                lo, hi = bounds
+                sizes["date"] = hi - lo
+
+        seed = min(sizes, key=sizes.get) if sizes else None
+        if seed is None:
+            result = cls.all_events
+        elif seed == "date":
+            result = cls.all_events[lo:hi]
+        elif seed == "customer":
+            result = list(merge(*postings["customer"], key=attrgetter("event_id")))
+        else:
+            result = list(postings[seed])
+
+        # 其餘條件合併成一次掃描：直接讀欄位（col[e.idx]），不產生中間清單
+        want_tn = tracking if tracking and seed != "tracking" else None
+        want_tnums = tnums if "customer" in postings and seed != "customer" else None
+        # 車輛 / 倉庫比對整數代碼；代碼不存在 = 沒有任何事件符合
+        want_vehicle = want_warehouse = None
+        if vehicle and seed != "vehicle":
+            want_vehicle = cls._veh_codes.get(vehicle)
+            if want_vehicle is None:
+                return []
+        if warehouse and seed != "warehouse":
+            want_warehouse = cls._wh_codes.get(warehouse)
+            if want_warehouse is None:
+                return []
+        want_dates = "date" in sizes and seed != "date"
+        keyword = location.lower() if location else None
+
+        if not (want_tn or want_tnums is not None or want_vehicle or want_warehouse
+                or want_dates or keyword or ts_range):
+            return result
+        if not want_dates:
+            lo, hi = 0, len(cls._col_tracking)
+        ts_lo, ts_hi = ts_range or (None, None)
+
+        col_tn, col_vehicle = cls._col_tracking, cls._col_vehicle
+        col_warehouse, col_loc = cls._col_warehouse, cls._col_location_lower
+        col_ts = cls._col_timestamp
+        matched = []
+        for e in result:
+            i = e.idx
+            if not lo <= i < hi:
+                continue
+            if ts_lo is not None and not ts_lo <= col_ts[i] <= ts_hi:
+                continue
+            if want_tn is not None and col_tn[i] != want_tn:
+                continue
+            if want_tnums is not None and col_tn[i] not in want_tnums:
+                continue
+            if want_vehicle is not None and col_vehicle[i] != want_vehicle:
+                continue
+            if want_warehouse is not None and col_warehouse[i] != want_warehouse:
+                continue
+            if keyword is not None and keyword not in col_loc[i]:
+                continue
+            matched.append(e)
+        return matched
 
     # ============================================================
     # （F）系統健康狀態（非功能性需求 2.2）
@@ -238,17 +732,17 @@ class TrackingEvent:
     # ============================================================
     @classmethod
     def check_consistency(cls):
+        """同一包裹的事件依寫入順序檢查：時間倒退一次記一個問題"""
         issues = 0
+        col = cls._col_timestamp
 
-        grouped = {}
-        for e in cls.all_events:
-            grouped.setdefault(e.tracking_number, []).append(e)
-
-        for tnum, events in grouped.items():
-            sorted_events = sorted(events, key=lambda e: e.timestamp)
-            for i in range(1, len(sorted_events)):
-                if sorted_events[i].timestamp < sorted_events[i - 1].timestamp:
+        for events in cls.by_tracking.values():
+            prev = None
+            for e in events:
+                ts = col[e.idx]
+                if prev is not None and ts < prev:
                     issues += 1
+                prev = ts
 
         return issues
 
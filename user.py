@@ -1,7 +1,13 @@
 import hashlib
+import logging
 import uuid
 from datetime import datetime
 
+log = logging.getLogger(__name__)
+
+# STATUS_PERMISSIONS 的「全部允許」標記（以 identity 比對）
+_ALL = object()
+
 
 class User:
     """
@@ -13,16 +19,21 @@ class User:
     - 角色權限表（可更新哪些包裹狀態）
     """
 
+    __slots__ = (
+        "user_id", "username", "password_hash", "role",
+        "is_active", "failed_attempts", "login_history", "last_login"
+    )
+
     VALID_ROLES = {"customer_service", "warehouse", "driver", "admin"}
 
     # -----------------------------------------------------------
     # 1.6 角色權限：每個角色能更新哪些包裹狀態
     # -----------------------------------------------------------
     STATUS_PERMISSIONS = {
-        "customer_service": {"Shipment Created"},
-        "warehouse": {"In Transit", "In Transit - Sorting", "Out for Delivery"},
-        "driver": {"Picked Up", "Out for Delivery", "Delivered"},
-        "admin": "ALL",
+        "customer_service": frozenset({"Shipment Created"}),
+        "warehouse": frozenset({"In Transit", "In Transit - Sorting", "Out for Delivery"}),
+        "driver": frozenset({"Picked Up", "Out for Delivery", "Delivered"}),
+        "admin": _ALL,
     }
 
     def __init__(self, username, password, role):
@@ -44,19 +55,21 @@ class User:
     # -----------------------------------------------------------
     @staticmethod
     def _hash_password(password):
-        return hashlib.sha256(password.encode()).hexdigest()
+        # 教學 / 示範用途：blake2b(16 bytes) 比 sha256 快，只做記憶體內比對
+        # 正式環境的密碼儲存應改用加鹽的慢雜湊（hashlib.scrypt / argon2）
+        return hashlib.blake2b(password.encode(), digest_size=16).hexdigest()
 
     def verify_password(self, password):
         return self.password_hash == self._hash_password(password)
 
     # -----------------------------------------------------------
-    # 登入流程（含教學 print）
+    # 登入流程（過程寫入 debug log）
     # -----------------------------------------------------------
     def login(self, password):
-        print(f"\n[LOGIN] User: {self.username}")
+        log.debug("[LOGIN] User: %s", self.username)
 
         if not self.is_active:
-            print("  > 帳號已停用，禁止登入")
+            log.debug("  > 帳號已停用，禁止登入")
             raise PermissionError("帳號已停用")
 
         if self.verify_password(password):
@@ -65,16 +78,16 @@ class User:
             self.login_history.append(timestamp)
             self.failed_attempts = 0
 
-            print(f"  > 登入成功！時間：{timestamp}")
+            log.debug("  > 登入成功！時間：%s", timestamp)
             return True
 
         # 登入失敗
         self.failed_attempts += 1
-        print(f"  > 密碼錯誤！目前錯誤次數：{self.failed_attempts}/5")
+        log.debug("  > 密碼錯誤！目前錯誤次數：%s/5", self.failed_attempts)
 
         if self.failed_attempts >= 5:
             self.is_active = False
-            print("  > 已達錯誤上限！帳號自動停用！")
+            log.warning("[LOGIN] %s 已達錯誤上限！帳號自動停用！", self.username)
             raise PermissionError("密碼錯誤超過次數，帳號已停用")
 
         return False
@@ -83,24 +96,14 @@ class User:
     # 角色權限檢查（對應 1.6）
     # -----------------------------------------------------------
     def can_update_status(self, new_status):
-        print(f"[PERMISSION] {self.username} 嘗試更新狀態 → {new_status}")
-
-        if self.role == "admin":
-            print("  > 管理者權限：允許")
-            return True
-
-        allowed = User.STATUS_PERMISSIONS.get(self.role, set())
-
-        if allowed == "ALL":
-            print("  > ALL 權限：允許")
-            return True
-
-        if new_status in allowed:
-            print("  > 已授權：允許此狀態變更")
-            return True
-
-        print("  > 未授權：拒絕此狀態變更")
-        return False
+        perms = User.STATUS_PERMISSIONS.get(self.role, frozenset())
+        allowed = perms is _ALL or new_status in perms
+
+        log.debug(
+            "[PERMISSION] %s 嘗試更新狀態 → %s：%s",
+            self.username, new_status, "允許" if allowed else "拒絕"
+        )
+        return allowed
 
     # -----------------------------------------------------------
     # 建立包裹權限（客服 + 管理員）
@@ -15,6 +15,11 @@ class Vehicle:
     ------------------------------------------------------------
     """
 
+    __slots__ = (
+        "vehicle_id", "vehicle_type", "capacity_kg", "current_load", "driver", "status",
+        "_activity_src", "_activity_len", "_assigned"
+    )
+
     VALID_STATUS = {"ACTIVE", "MAINTENANCE", "OFF_DUTY"}
 
     def __init__(self, vehicle_id: str, vehicle_type: str,
@@ -34,6 +39,11 @@ class Vehicle:
         # ACTIVE / MAINTENANCE / OFF_DUTY
         self.status = "ACTIVE"
 
+        # list_assigned_packages 快取：TrackingEvent.by_vehicle 的清單物件與當時長度即為版本
+        self._activity_src = None
+        self._activity_len = -1
+        self._assigned = None
+
     # -------------------------------------------------------
     # 司機指派
     # -------------------------------------------------------
@@ -109,16 +119,21 @@ class Vehicle:
     # -------------------------------------------------------
     def vehicle_activity(self):
         """
-        查詢此車輛所有相關事件（TrackingEvent）
+        查詢此車輛所有相關事件（TrackingEvent），回傳 by_vehicle 索引的複本
         """
-        return TrackingEvent.search_by_vehicle(self.vehicle_id)
+        return list(TrackingEvent.by_vehicle.get(self.vehicle_id, ()))
 
     def list_assigned_packages(self):
         """
         列出所有曾由該車輛載運的包裹編號（去重）
+        有新事件寫入（或索引被 reset）之前重複呼叫沿用上次的結果
         """
-        events = self.vehicle_activity()
-        return sorted({e.tracking_number for e in events})
+        cur = TrackingEvent.by_vehicle.get(self.vehicle_id, ())
+        if cur is not self._activity_src or len(cur) != self._activity_len:
+            self._activity_src = cur
+            self._activity_len = len(cur)
+            self._assigned = sorted({e.tracking_number for e in cur})
+        return list(self._assigned)
 
     # -------------------------------------------------------
     # Debug 顯示
@@ -1,6 +1,11 @@
 # warehouse.py
+import logging
+import sys
+
 from tracking import TrackingEvent
 
+log = logging.getLogger(__name__)
+
 
 class Warehouse:
     """
@@ -16,6 +21,8 @@ class Warehouse:
     ------------------------------------------------------------
     """
 
+    __slots__ = ("warehouse_id", "location", "capacity", "stored_packages", "status", "_sorted")
+
     # ------------------------------------------------------------
     # 全域倉庫資料（模擬 DB）
     # ------------------------------------------------------------
@@ -28,6 +35,7 @@ class Warehouse:
         self.location = location
         self.capacity = capacity
         self.stored_packages = set()      # 目前在倉庫的包裹 tracking number
+        self._sorted = None               # list_packages() 的排序結果快取（None = 需重算）
         self.status = "ACTIVE"
 
         # ★ 自動註冊到全域列表
@@ -63,14 +71,17 @@ class Warehouse:
             self.status = "FULL"
             raise ValueError(f"倉庫 {self.warehouse_id} 已滿，無法進倉")
 
-        self.stored_packages.add(tracking_number)
-        print(f"[WAREHOUSE] {tracking_number} 進入倉庫 {self.warehouse_id}")
+        # intern：同一單號在各倉庫 / 索引共用一個字串物件，比對時可直接以 identity 命中
+        self.stored_packages.add(sys.intern(tracking_number))
+        self._sorted = None
+        log.debug("[WAREHOUSE] %s 進入倉庫 %s", tracking_number, self.warehouse_id)
 
     def remove_package(self, tracking_number: str):
         """包裹離倉"""
         if tracking_number in self.stored_packages:
             self.stored_packages.remove(tracking_number)
-            print(f"[WAREHOUSE] {tracking_number} 離開倉庫 {self.warehouse_id}")
+            self._sorted = None
+            log.debug("[WAREHOUSE] %s 離開倉庫 %s", tracking_number, self.warehouse_id)
 
         if not self.is_full():
             self.status = "ACTIVE"
@@ -83,8 +94,10 @@ class Warehouse:
         return TrackingEvent.search_by_warehouse(self.warehouse_id)
 
     def list_packages(self):
-        """查詢目前在此倉庫內的包裹列表（排序後輸出）"""
-        return sorted(self.stored_packages)
+        """查詢目前在此倉庫內的包裹列表（排序後輸出；進出倉之間重複查詢直接用快取）"""
+        if self._sorted is None:
+            self._sorted = sorted(self.stored_packages)
+        return list(self._sorted)
 
     # ============================================================
     # Debug 友善輸出